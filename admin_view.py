@@ -1,8 +1,33 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from analytics import TransactionStats
+import instrumentation
+import checkout_journal
+from trx_export import EXPORT_FORMATS, MAX_DOWNLOAD_ROWS, PARQUET_AVAILABLE, export_bytes
+from segmentation import TIER_COLORS, TIER_ORDER, TIER_THRESHOLDS, segment_rfm
+from trx_browser import PAGE_SIZE, CountCache, fetch_page
 
-def show_admin_dashboard(df_trx, navigate_to, get_logo_svg):
+SPANS_EXPORT_PATH = "logs/spans.jsonl"
+
+# COUNT(*) per filter, sekali per proses (bukan per sesi), TTL 30 detik
+@st.cache_resource
+def get_count_cache():
+    return CountCache(ttl_seconds=30)
+
+TIER_STRATEGIES = ["Layanan Personal.", "Paket Bundling.", "Promo Diskon.", "Voucher Reguler.", "Pancingan Buy 1 Get 1."]
+
+def tier_strategy_markdown():
+    # Teks strategi mengikuti ambang tier yang aktif (HOLYGRAIL_TIER_THRESHOLDS)
+    limits = [f"> {t / 1e6:g} Juta" for t in sorted(TIER_THRESHOLDS, reverse=True)]
+    limits.append(f"< {min(TIER_THRESHOLDS) / 1e6:g} Juta")
+    return "\n".join(f"**{label.split(' (')[0]} ({limit})** {strategy}" for label, limit, strategy in zip(TIER_ORDER, limits, TIER_STRATEGIES))
+
+def show_admin_dashboard(df_trx, navigate_to, get_logo_svg, stats=None, engine=None, segments=None):
+    # stats: agregat berjalan dari analytics.IncrementalAnalytics. Kalau tidak dikirim, dihitung dari df_trx
+    # engine: untuk export streaming dari database. Tanpa engine, export diambil dari df_trx
+    # segments: segmentation.CustomerSegments (cache per pelanggan). Tanpa itu, tier dihitung dari stats.rfm()
+    if stats is None: stats = TransactionStats.from_frame(df_trx)
     
     # --- STYLE CSS ---
     st.markdown("""<style>.metric-card { background-color: #ffffff; border: 1px solid #e0e0e0; border-radius: 12px; padding: 20px; text-align: center; box-shadow: 0 4px 6px rgba(0,0,0,0.05); }.metric-label { font-size: 14px; color: #666; font-weight: 600; text-transform: uppercase; }.metric-value { font-size: 28px; font-weight: 800; color: #2c3e50; margin: 10px 0; }.metric-delta { font-size: 12px; font-weight: 600; }</style>""", unsafe_allow_html=True)
@@ -16,16 +41,15 @@ def show_admin_dashboard(df_trx, navigate_to, get_logo_svg):
 
     st.title("📊 Dashboard Admin (Pro + Export)")
     
-    if df_trx.empty: 
+    if stats.empty: 
         st.warning("⚠️ Belum ada data. Silakan lakukan transaksi dulu.")
         return
 
-    # --- METRICS UTAMA ---
-    total_revenue = df_trx['total_price'].sum()
-    total_orders = len(df_trx) 
+    # --- METRICS UTAMA (dari agregat berjalan, tidak hitung ulang seluruh histori) ---
+    total_revenue = stats.revenue
+    total_orders = stats.order_count 
     avg_order = total_revenue / total_orders if total_orders > 0 else 0
-    # Mode bisa error jika data kosong atau multimodal, kita handle aman
-    best_seller = df_trx['menu_name'].mode()[0] if not df_trx['menu_name'].mode().empty else "-"
+    best_seller = stats.best_seller()
     
     c1, c2, c3, c4 = st.columns(4)
     with c1: st.markdown(f"<div class='metric-card'><div class='metric-label'>Omzet</div><div class='metric-value'>Rp {total_revenue:,.0f}</div><div class='metric-delta' style='color:#16a34a;'>↗ All Time</div></div>", unsafe_allow_html=True)
@@ -36,67 +60,45 @@ def show_admin_dashboard(df_trx, navigate_to, get_logo_svg):
     st.markdown("---")
     
     # --- TABS ANALISIS ---
-    tab1, tab2, tab3, tab4 = st.tabs(["💎 5-Tier Segmentasi", "📈 Tren Penjualan", "🍔 Analisis Menu", "📝 Data Transaksi"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["💎 5-Tier Segmentasi", "📈 Tren Penjualan", "🍔 Analisis Menu", "📝 Data Transaksi", "⏱️ Performance"])
     
     # 1. TAB SEGMENTASI
     with tab1:
+        # Segmen disimpan per pelanggan & dihitung ulang hanya untuk yang punya order baru (segmentation.py)
+        seg_modes = {"5-Tier (Ambang Belanja)": "tier"}
+        if segments is not None and segments.kmeans is not None: seg_modes["KMeans (Model)"] = "kmeans"
+        seg_mode = seg_modes[st.radio("Mode Segmentasi", list(seg_modes), horizontal=True)] if len(seg_modes) > 1 else "tier"
+        with instrumentation.span("admin.segments"):
+            rfm = segments.refresh().frame(seg_mode) if segments is not None else segment_rfm(stats.rfm())
+        if seg_mode == "kmeans":
+            seg_order, seg_colors = segments.kmeans.order, None
+        else:
+            seg_order, seg_colors = TIER_ORDER, TIER_COLORS
+
         c_left, c_right = st.columns([2, 1])
         with c_left:
-            st.subheader("🔍 Peta Pelanggan (5 Level)")
-            
-            rfm = df_trx.groupby('customer_name').agg({
-                'total_price': 'sum', 
-                'order_datetime': 'count'
-            }).reset_index()
-            rfm.columns = ['Nama', 'Total_Belanja', 'Jumlah_Order']
-            
-            # Tier Calibration (Sesuai Visual Grafik)
-            def get_5_tier_segment(row):
-                val = row['Total_Belanja']
-                if val >= 10_000_000: return '1. 💎 Diamond (VVIP)'
-                elif val >= 4_500_000: return '2. 👑 Platinum (High)'
-                elif val >= 3_000_000: return '3. 🥇 Gold (Mid-High)'
-                elif val >= 1_000_000: return '4. 🥈 Silver (Mid-Low)'
-                else: return '5. 🥉 Bronze (Low)'
-            
-            rfm['Segment'] = rfm.apply(get_5_tier_segment, axis=1)
+            st.subheader("🔍 Peta Pelanggan (5 Level)" if seg_mode == "tier" else "🔍 Peta Pelanggan (Cluster KMeans)")
             
             fig_cluster = px.scatter(
                 rfm, x='Total_Belanja', y='Jumlah_Order', color='Segment',
-                hover_data=['Nama'], title="Sebaran Pelanggan 5 Tingkat",
-                color_discrete_map={
-                    '1. 💎 Diamond (VVIP)': '#b9f2ff', 
-                    '2. 👑 Platinum (High)': '#e5e4e2',
-                    '3. 🥇 Gold (Mid-High)': '#FFD700', 
-                    '4. 🥈 Silver (Mid-Low)': '#C0C0C0',
-                    '5. 🥉 Bronze (Low)': '#cd7f32'
-                },
-                category_orders={"Segment": ["1. 💎 Diamond (VVIP)", "2. 👑 Platinum (High)", "3. 🥇 Gold (Mid-High)", "4. 🥈 Silver (Mid-Low)", "5. 🥉 Bronze (Low)"]}
+                hover_data=['Nama'], title="Sebaran Pelanggan 5 Tingkat" if seg_mode == "tier" else "Sebaran Pelanggan per Cluster",
+                color_discrete_map=seg_colors,
+                category_orders={"Segment": seg_order}
             )
             fig_cluster.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
             st.plotly_chart(fig_cluster, use_container_width=True)
 
         with c_right:
             st.subheader("💡 Strategi")
-            st.markdown("""
-            **1. 💎 Diamond (> 10 Juta)** Layanan Personal.
-            **2. 👑 Platinum (> 4.5 Juta)** Paket Bundling.
-            **3. 🥇 Gold (> 3 Juta)** Promo Diskon.
-            **4. 🥈 Silver (> 1 Juta)** Voucher Reguler.
-            **5. 🥉 Bronze (< 1 Juta)** Pancingan Buy 1 Get 1.
-            """)    
+            if seg_mode == "tier":
+                st.markdown(tier_strategy_markdown())
             st.write(rfm['Segment'].value_counts())
         
     # 2. TAB SALES TREND
     with tab2:
         st.subheader("⏰ Tren Penjualan (Jam Sibuk)")
         
-        df_trx['order_datetime'] = pd.to_datetime(df_trx['order_datetime'])
-        df_trx['Jam'] = df_trx['order_datetime'].dt.hour
-        
-        hourly_sales = df_trx.groupby('Jam')['total_price'].sum().reset_index()
-        all_hours = pd.DataFrame({'Jam': range(24)})
-        hourly_sales = all_hours.merge(hourly_sales, on='Jam', how='left').fillna(0)
+        hourly_sales = stats.hourly_sales()
 
         fig_trend = px.area(
             hourly_sales, x='Jam', y='total_price', markers=True, 
@@ -110,52 +112,128 @@ def show_admin_dashboard(df_trx, navigate_to, get_logo_svg):
     # 3. TAB MENU ANALYSIS
     with tab3:
         st.subheader("🏆 Analisis Menu")
-        df_minuman = df_trx[df_trx['category'] == 'Minuman']
-        df_makanan = df_trx[df_trx['category'] != 'Minuman']
+        top_food = stats.top_menu(drinks=False, n=5)
+        top_drink = stats.top_menu(drinks=True, n=5)
         c_food, c_drink = st.columns(2)
         
         with c_food:
-            if not df_makanan.empty:
-                top_food = df_makanan['menu_name'].value_counts().head(5).reset_index()
-                top_food.columns = ['Menu', 'Terjual']
+            if not top_food.empty:
                 st.plotly_chart(px.bar(top_food, x='Terjual', y='Menu', orientation='h', color='Terjual', color_continuous_scale='OrRd'), use_container_width=True)
 
         with c_drink:
-            if not df_minuman.empty:
-                top_drink = df_minuman['menu_name'].value_counts().head(5).reset_index()
-                top_drink.columns = ['Menu', 'Terjual']
+            if not top_drink.empty:
                 st.plotly_chart(px.bar(top_drink, x='Terjual', y='Menu', orientation='h', color='Terjual', color_continuous_scale='Teal'), use_container_width=True)
 
     # 4. TAB DATA TRANSAKSI (DENGAN FITUR DOWNLOAD)
     with tab4:
         st.subheader("📝 Data Riwayat Transaksi")
         
-        # Filter
+        # Filter masuk ke WHERE: tabel dibaca per halaman (trx_browser.py), export per chunk (trx_export.py)
         col_f1, col_f2 = st.columns([3, 1])
         with col_f1:
-            pil_kategori = st.multiselect("Filter Kategori", df_trx['category'].unique())
+            all_cats = stats.per_menu.index.get_level_values('category').unique() if not stats.per_menu.empty else df_trx['category'].unique()
+            pil_kategori = st.multiselect("Filter Kategori", sorted(all_cats))
+        with col_f2:
+            rentang = st.date_input("Rentang Tanggal", value=(), format="YYYY-MM-DD")
+        tgl_awal, tgl_akhir = (list(rentang) + [None, None])[:2]
         
-        df_show = df_trx.sort_values(by='order_datetime', ascending=False)
-        if pil_kategori:
-            df_show = df_show[df_show['category'].isin(pil_kategori)]
+        if engine is not None:
+            # Ganti filter = kembali ke halaman 1. Kursor tiap halaman disimpan supaya bisa mundur
+            filter_key = CountCache.key(tgl_awal, tgl_akhir, pil_kategori)
+            if st.session_state.get('trx_filter') != filter_key:
+                st.session_state['trx_filter'] = filter_key
+                st.session_state['trx_cursors'] = [None]
+            cursors = st.session_state['trx_cursors']
+            with instrumentation.span("admin.trx_page"):
+                page = fetch_page(engine, tgl_awal, tgl_akhir, pil_kategori, cursor=cursors[-1])
+                total = get_count_cache().count(engine, tgl_awal, tgl_akhir, pil_kategori)
             
-        # Tampilkan Tabel
-        st.dataframe(df_show, use_container_width=True)
-        st.caption(f"Menampilkan {len(df_show)} baris data.")
+            # Tampilkan Tabel
+            st.dataframe(page.frame, use_container_width=True)
+            col_prev, col_info, col_next = st.columns([1, 3, 1])
+            with col_prev:
+                if st.button("⬅️ Sebelumnya", disabled=len(cursors) == 1, use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with col_info:
+                st.caption(f"Halaman {len(cursors)} dari {max(1, -(-total // PAGE_SIZE))} · {total:,} transaksi")
+            with col_next:
+                if st.button("Berikutnya ➡️", disabled=not page.has_next, use_container_width=True):
+                    cursors.append(page.next_cursor)
+                    st.rerun()
+        else:
+            df_show = df_trx.sort_values(by='order_datetime', ascending=False)
+            if pil_kategori:
+                df_show = df_show[df_show['category'].isin(pil_kategori)]
+            if tgl_awal is not None:
+                df_show = df_show[df_show['order_datetime'].dt.date >= tgl_awal]
+            if tgl_akhir is not None:
+                df_show = df_show[df_show['order_datetime'].dt.date <= tgl_akhir]
+                
+            # Tampilkan Tabel
+            st.dataframe(df_show, use_container_width=True)
+            st.caption(f"Menampilkan {len(df_show)} baris data.")
 
         # --- FITUR DOWNLOAD ---
         st.markdown("### 📥 Export Laporan")
         
-        # Convert DF to CSV
-        csv = df_show.to_csv(index=False).encode('utf-8')
+        # File baru dibuat saat tombol diklik (data=callable), dibaca dari database per chunk (trx_export.py)
+        if engine is not None:
+            make_csv = lambda: export_bytes(engine, "csv", tgl_awal, tgl_akhir, pil_kategori)
+            make_parquet = lambda: export_bytes(engine, "parquet", tgl_awal, tgl_akhir, pil_kategori)
+            # Download Streamlit = seluruh file di memori server, jadi dibatasi; histori penuh lewat CLI
+            if total > MAX_DOWNLOAD_ROWS:
+                st.warning(f"⚠️ Download dibatasi {MAX_DOWNLOAD_ROWS:,} transaksi terbaru dari {total:,}. "
+                           "Untuk histori penuh: `python trx_export.py --format csv --out laporan.csv`")
+            else:
+                st.caption(f"Maksimal {MAX_DOWNLOAD_ROWS:,} transaksi per download.")
+        else:
+            make_csv = lambda: df_show.to_csv(index=False).encode('utf-8')
+            make_parquet = lambda: df_show.to_parquet(index=False)
         
         col_dl1, col_dl2 = st.columns(2)
         with col_dl1:
             st.download_button(
                 label="📄 Download sebagai CSV",
-                data=csv,
+                data=make_csv,
                 file_name='laporan_penjualan_holygrail.csv',
                 mime='text/csv',
                 type='primary',
                 use_container_width=True
             )
+        with col_dl2:
+            if PARQUET_AVAILABLE:
+                st.download_button(
+                    label="🧱 Download sebagai Parquet",
+                    data=make_parquet,
+                    file_name='laporan_penjualan_holygrail.parquet',
+                    mime=EXPORT_FORMATS['parquet'][0],
+                    use_container_width=True
+                )
+
+    # 5. TAB PERFORMANCE (SPAN WAKTU DARI instrumentation.py, PROSES INI SAJA)
+    with tab5:
+        st.subheader("⏱️ Waktu per Bagian (ms)")
+        perf = instrumentation.summary()
+        if perf.empty:
+            st.info("Belum ada span tercatat. Buka halaman kasir dulu.")
+        else:
+            st.dataframe(perf.round(2), use_container_width=True)
+            st.plotly_chart(px.bar(perf, x='p95_ms', y='span', orientation='h', color='p99_ms', color_continuous_scale='Reds'), use_container_width=True)
+
+        # Journal checkout (write-behind) di proses ini: antrian & lag sampai order masuk database
+        for jm in checkout_journal.active_metrics():
+            st.caption(f"📮 Journal checkout: antre {jm['depth']} · lag tertua {jm['oldest_pending_s']:.1f} s · lag batch terakhir {jm['last_lag_s']:.2f} s · "
+                       f"flush {jm['last_flush_ms']:.1f} ms · retry {jm['retries']} · gagal {jm['dead']}")
+
+        c_dl, c_save, c_reset = st.columns(3)
+        with c_dl:
+            # Callable: JSONL baru dibuat saat tombol diklik, bukan tiap rerun admin
+            st.download_button("📥 Download Span (JSONL)", data=lambda: instrumentation.to_jsonl().encode('utf-8'), file_name="spans.jsonl", mime="application/x-ndjson")
+        with c_save:
+            if st.button(f"💾 Simpan ke {SPANS_EXPORT_PATH}"):
+                st.success(f"Tersimpan: {instrumentation.export_jsonl(SPANS_EXPORT_PATH)}")
+        with c_reset:
+            if st.button("🧹 Reset Span"):
+                instrumentation.reset()
+                st.rerun()
@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+# ==========================================
+# 📊 ANALYTICS INKREMENTAL (ADMIN DASHBOARD)
+# ==========================================
+# Dulu tiap rerun admin (klik tab, ganti filter) join penuh orders x menu x users lalu hitung ulang semua.
+# Sekarang: agregat disimpan berjalan (running), dan dari DB cuma ditarik order yang lebih baru dari
+# high-water-mark `order_id` (bukan `timestamp`: order dari checkout_journal masuk telat dengan jam jual
+# lama, tapi order_id-nya tetap baru). Refresh dibatasi TTL.
+#
+# order_id dialokasikan saat INSERT, bukan saat commit: transaksi yang masih jalan (flush journal proses lain,
+# chunk checkout.bulk_ingest) bisa commit id lebih kecil SETELAH id yang lebih besar terbaca. OrderCursor
+# mengingat id yang terlewat di bawah high-water-mark (gap) dan menariknya lagi tiap refresh sampai muncul.
+# Gap yang tetap hilang lebih dari ORDER_GAP_SECONDS dianggap rollback / order dihapus. Dipakai juga oleh
+# segmentation.py dan model_retrain.py.
+
+ORDER_GAP_SECONDS = float(os.environ.get('HOLYGRAIL_ORDER_GAP_SECONDS', '600'))
+MAX_ORDER_GAPS = 5000
+
+TRX_COLUMNS = ['order_datetime', 'menu_name', 'total_price', 'category', 'customer_name']
+
+TRX_FIELDS = """o.timestamp as order_datetime, m.menu_name, m.price as total_price,
+       m.category, u.name as customer_name"""
+
+TRX_FROM = """FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+"""
+
+TRX_QUERY = f"""
+SELECT {TRX_FIELDS}
+{TRX_FROM}"""
+
+INCREMENTAL_QUERY = f"""
+SELECT o.order_id, {TRX_FIELDS}
+{TRX_FROM}WHERE {{where}}
+ORDER BY o.order_id
+"""
+
+
+def order_statement(sql, params):
+    # text() dengan parameter list (IN :gap_ids) di-expand SQLAlchemy, list kosong juga aman
+    lists = [bindparam(k, expanding=True) for k, v in params.items() if isinstance(v, (list, tuple)) and f":{k}" in sql]
+    return text(sql).bindparams(*lists) if lists else text(sql)
+
+
+class OrderCursor:
+    # High-water-mark order_id + gap {order_id: time.time() pertama terlihat hilang}
+    def __init__(self, last_id=0, gaps=None, gap_seconds=ORDER_GAP_SECONDS, max_gaps=MAX_ORDER_GAPS):
+        self.last_id = int(last_id)
+        self.gaps = {int(k): float(v) for k, v in (gaps or {}).items()}
+        self.gap_seconds = gap_seconds
+        self.max_gaps = max_gaps
+
+    def where(self, column='o.order_id'):
+        # (klausa SQL, params) untuk order yang belum pernah dibaca
+        if not self.gaps: return f"{column} > :last_id", {"last_id": self.last_id}
+        return f"({column} > :last_id OR {column} IN :gap_ids)", {"last_id": self.last_id, "gap_ids": sorted(self.gaps)}
+
+    def advance(self, ids):
+        # ids: order_id hasil query where(). Gap yang muncul dihapus, gap baru di antara high-water-mark lama
+        # dan id terbesar dicatat (terbaru dulu, maksimal max_gaps), gap lama yang kedaluwarsa dibuang
+        now = time.time()
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        for i in ids[ids <= self.last_id].tolist(): self.gaps.pop(i, None)
+        self.gaps = {i: t for i, t in self.gaps.items() if now - t < self.gap_seconds}
+        new = ids[ids > self.last_id]
+        if len(new):
+            bounds = np.concatenate([[self.last_id], new])
+            missing = []
+            for j in np.flatnonzero(np.diff(bounds) > 1)[::-1]:
+                missing.extend(range(int(bounds[j + 1]) - 1, int(bounds[j]), -1))
+                if len(missing) >= self.max_gaps: break
+            self.gaps.update(dict.fromkeys(missing[:self.max_gaps], now))
+            self.last_id = int(new[-1])
+        if len(self.gaps) > self.max_gaps:
+            self.gaps = {i: self.gaps[i] for i in sorted(self.gaps)[-self.max_gaps:]}
+
+    def state(self):
+        # Bentuk JSON (disimpan di meta versi model_retrain)
+        return {"last_id": self.last_id, "gaps": {str(i): t for i, t in self.gaps.items()}}
+
+
+class TransactionStats:
+    # Agregat berjalan: omzet, jumlah order, per pelanggan, per jam, per menu
+    def __init__(self):
+        self.revenue = 0.0
+        self.order_count = 0
+        self.per_customer = pd.DataFrame(columns=['Total_Belanja', 'Jumlah_Order'], dtype=float, index=pd.Index([], name='customer_name'))
+        self.hourly = np.zeros(24)
+        self.per_menu = pd.Series(dtype=np.int64, index=pd.MultiIndex.from_tuples([], names=['menu_name', 'category']))
+        self.frame = pd.DataFrame(columns=TRX_COLUMNS)
+        self.high_water_mark = None
+
+    @classmethod
+    def from_frame(cls, df_trx):
+        stats = cls()
+        stats.ingest(df_trx)
+        return stats
+
+    def ingest(self, chunk):
+        if chunk is None or chunk.empty: return
+        chunk = chunk.copy()
+        chunk['order_datetime'] = pd.to_datetime(chunk['order_datetime'], format='ISO8601')
+
+        self.revenue += float(chunk['total_price'].sum())
+        self.order_count += len(chunk)
+
+        cust = chunk.groupby('customer_name')['total_price'].agg(['sum', 'count'])
+        cust.columns = ['Total_Belanja', 'Jumlah_Order']
+        self.per_customer = self.per_customer.add(cust, fill_value=0)
+
+        self.hourly += np.bincount(chunk['order_datetime'].dt.hour, weights=chunk['total_price'].astype(float), minlength=24)
+
+        menu = chunk.groupby(['menu_name', 'category']).size()
+        self.per_menu = self.per_menu.add(menu, fill_value=0).astype(np.int64)
+
+        self.frame = chunk if self.frame.empty else pd.concat([self.frame, chunk], ignore_index=True)
+        hwm = chunk['order_datetime'].max()
+        self.high_water_mark = hwm if self.high_water_mark is None else max(self.high_water_mark, hwm)
+
+    @property
+    def empty(self):
+        return self.order_count == 0
+
+    def best_seller(self):
+        if self.per_menu.empty: return "-"
+        counts = self.per_menu.groupby(level='menu_name').sum()
+        return counts[counts == counts.max()].index.min()
+
+    def rfm(self):
+        rfm = self.per_customer.reset_index()
+        rfm.columns = ['Nama', 'Total_Belanja', 'Jumlah_Order']
+        rfm['Jumlah_Order'] = rfm['Jumlah_Order'].astype(np.int64)
+        return rfm
+
+    def hourly_sales(self):
+        return pd.DataFrame({'Jam': range(24), 'total_price': self.hourly})
+
+    def top_menu(self, drinks, n=5):
+        if self.per_menu.empty: return pd.DataFrame(columns=['Menu', 'Terjual'])
+        cats = self.per_menu.index.get_level_values('category')
+        sub = self.per_menu[(cats == 'Minuman') if drinks else (cats != 'Minuman')]
+        top = sub.groupby(level='menu_name').sum().sort_values(ascending=False, kind='stable').head(n).reset_index()
+        top.columns = ['Menu', 'Terjual']
+        return top
+
+
+class IncrementalAnalytics:
+    def __init__(self, engine, ttl_seconds=30):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self.stats = TransactionStats()
+        self.cursor = OrderCursor()
+        self.last_refresh = 0.0
+        self.rows_pulled = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and time.monotonic() - self.last_refresh < self.ttl_seconds:
+                return self.stats
+            where, params = self.cursor.where()
+            chunk = pd.read_sql(order_statement(INCREMENTAL_QUERY.format(where=where), params), self.engine, params=params)
+            self.cursor.advance(chunk['order_id'])
+            chunk = chunk.drop(columns='order_id')
+            self.stats.ingest(chunk)
+            self.rows_pulled += len(chunk)
+            self.last_refresh = time.monotonic()
+            return self.stats
+
+    def reset(self):
+        with self._lock:
+            self.stats = TransactionStats()
+            self.cursor = OrderCursor()
+            self.last_refresh = 0.0
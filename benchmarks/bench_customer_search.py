@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from customer_search import CustomerNameIndex, search_customers
+
+# ==========================================
+# 📏 BENCHMARK: index nama member di memori vs query database
+# ==========================================
+# Jalankan: python benchmarks/bench_customer_search.py [--users 50000] [--db-url postgresql://...]
+
+FIRST = ['Budi', 'Siti', 'José', 'Ayu', 'Dewi', 'Rizky', 'Çahya', 'Eka', 'Putri', 'Agus', 'Rénata', 'Wayan']
+LAST = ['Santoso', 'Wijaya', 'Pérez', 'Lestari', 'Hidayat', 'Nugroho', 'Kusuma', 'Saputra']
+
+
+def timeit(fn, queries):
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--db-url', default=None, help="Kalau diisi: index dimuat dari tabel users dan dibandingkan dengan query ILIKE")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(0)
+    index = CustomerNameIndex()
+    t0 = time.perf_counter()
+    if args.db_url:
+        from database import make_engine
+        engine = make_engine(args.db_url)
+        index.sync(engine, force=True)
+    else:
+        index.add_many((uid, f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {uid}") for uid in range(1, args.users + 1))
+    print(f"Load {len(index)} nama: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    # Simulasi ketikan kasir: prefix 1..6 huruf dari nama acak, tanpa aksen & huruf kecil
+    names = [index._names[rnd.randrange(len(index))] for _ in range(args.queries)]
+    queries = [n[:rnd.randint(1, 6)].lower().replace('é', 'e').replace('ç', 'c') for n in names]
+    p50, p99 = timeit(index.search, queries)
+    print(f"Index memori : p50 {p50:8.1f} µs   p99 {p99:8.1f} µs   {index.stats()}")
+
+    if args.db_url:
+        p50, p99 = timeit(lambda q: search_customers(engine, q), queries[:200])
+        print(f"Query DB     : p50 {p50:8.1f} µs   p99 {p99:8.1f} µs")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ==========================================
+# 📏 LOAD TEST: INFERENCE SERVER vs SCORING IN-PROCESS
+# ==========================================
+# Jalankan inference_server.py sebagai proses terpisah, lalu simulasikan N kasir (thread, koneksi masing-masing)
+# yang terus meminta skor semua menu untuk pelanggan + konteks acak, seperti build_recommendations.
+# Dibandingkan dengan scoring in-process (scorer per proses, tanpa batching) untuk jumlah kasir yang sama.
+# Jalankan: python benchmarks/bench_inference.py [--tills 1,2,4,8,16,32] [--seconds 3] [--window-ms 2]
+
+
+def till_loop(score, n_users, n_menu, stop, lat, seed):
+    rng = np.random.default_rng(seed)
+    menu = np.arange(n_menu)
+    while not stop.is_set():
+        u, w, t, g = int(rng.integers(n_users)), int(rng.integers(2)), int(rng.integers(3)), int(rng.integers(2))
+        t0 = time.perf_counter()
+        score(u, menu, w, t, g)
+        lat.append((time.perf_counter() - t0) * 1000)
+
+
+def run(score_for_till, tills, seconds, n_users, n_menu):
+    stop, lats = threading.Event(), [[] for _ in range(tills)]
+    threads = [threading.Thread(target=till_loop, args=(score_for_till(k), n_users, n_menu, stop, lats[k], k)) for k in range(tills)]
+    for t in threads: t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads: t.join()
+    lat = np.concatenate([np.asarray(l) for l in lats])
+    return len(lat) / seconds, np.percentile(lat, 50), np.percentile(lat, 95)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tills', default="1,2,4,8,16,32")
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--addr', default=f"unix:/tmp/holygrail-bench-{os.getpid()}.sock")
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+
+    import model_registry
+    from inference_server import InferenceClient
+
+    scorer = model_registry.get_scorer()
+    vocab = scorer.vocab_sizes
+    server = subprocess.Popen([sys.executable, 'inference_server.py', '--addr', args.addr, '--window-ms', str(args.window_ms)],
+                              cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        client = InferenceClient(args.addr, timeout=2.0, fallback=lambda: None)
+        deadline = time.monotonic() + 60
+        while client.server_info() is None:
+            if server.poll() is not None or time.monotonic() > deadline: raise SystemExit("❌ inference server gagal start")
+            time.sleep(0.1)
+
+        print(f"runtime {model_registry.get_runtime()} · {vocab['menu']} menu per request · jendela {args.window_ms} ms · {os.cpu_count()} core")
+        rep = model_registry.load_report()
+        model_mb = sum(rep[k]['rss_delta_mb'] for k in ('model', 'bundle', 'scorer') if k in rep)
+        print(f"Model in-process: +{model_mb:.0f} MB RSS per proses Streamlit (N proses = N salinan); server: 1 salinan")
+        print(f"{'kasir':>5} | {'in-process req/s':>16} {'p50':>7} {'p95':>7} | {'server req/s':>12} {'p50':>7} {'p95':>7} {'batch':>6}")
+        for tills in [int(x) for x in args.tills.split(',')]:
+            local = run(lambda k: scorer.score, tills, args.seconds, vocab['user'], vocab['menu'])
+            before = client.server_info()
+            remote = run(lambda k: client.score, tills, args.seconds, vocab['user'], vocab['menu'])
+            after = client.server_info()
+            avg_batch = (after['requests'] - before['requests'] - 1) / max(after['batches'] - before['batches'], 1)
+            print(f"{tills:5d} | {local[0]:16,.0f} {local[1]:6.2f}ms {local[2]:6.2f}ms | {remote[0]:12,.0f} {remote[1]:6.2f}ms {remote[2]:6.2f}ms {avg_batch:6.1f}")
+        st = client.stats()
+        print(f"client: remote {st['remote']} · fallback {st['fallbacks']} · gagal {st['failures']}")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
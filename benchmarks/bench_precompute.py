@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ==========================================
+# 📏 BENCHMARK: PRECOMPUTE REKOMENDASI (SKALA PER CORE)
+# ==========================================
+# Jalankan rec_precompute.build_store dengan 1, 2, 4, ... proses untuk jumlah user yang sama (user encoder
+# diulang kalau --users lebih besar dari vocab model), lalu bandingkan dengan jalur live kasir
+# (build_recommendations x 12 konteks per user).
+# Jalankan: python benchmarks/bench_precompute.py --db-url sqlite:///resto.db [--users 20000] [--workers 1,2,4,8]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db-url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--workers', default=None, help="Daftar jumlah proses, default 1,2,4,.. sampai jumlah core")
+    parser.add_argument('--live-users', type=int, default=50)
+    args = parser.parse_args(argv)
+    if not args.db_url: parser.error("--db-url (atau DATABASE_URL) wajib diisi")
+    os.chdir(ROOT)
+
+    import model_registry
+    from database import make_engine
+    from menu_catalog import MenuCatalog
+    from kasir_view import build_recommendations
+    from rec_precompute import CONTEXTS, build_store
+
+    encoders, scorer = model_registry.get_encoders(), model_registry.get_scorer()
+    df_menu, menu_idx, version = MenuCatalog(make_engine(args.db_url), menu_encoder=lambda: encoders['menu_id']).refresh()
+    vocab = len(encoders['user_id'])
+    users = (np.arange(args.users), np.arange(args.users) % vocab)
+
+    cores = os.cpu_count() or 1
+    workers = [int(w) for w in args.workers.split(',')] if args.workers else sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i <= cores], cores})
+    print(f"{args.users} user x {len(CONTEXTS)} konteks x {len(df_menu)} menu · {cores} core")
+    base = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for w in workers:
+            _, rep = build_store(df_menu, menu_idx, version, scorer, encoders, tmp, workers=w, users=users, publish_store=False, log=lambda *_: None)
+            base = base or rep['users_per_s']
+            speedup = rep['users_per_s'] / base
+            print(f"{w:3d} proses  {rep['seconds']:7.2f} s  {rep['users_per_s']:10,.0f} user/detik  speedup {speedup:5.2f}x  efisiensi {speedup / w:5.0%}")
+
+    rng = np.random.default_rng(0)
+    uids = [int(c) for c in rng.choice(encoders['user_id'].classes_, args.live_users)]
+    t0 = time.perf_counter()
+    for uid in uids:
+        for w, t, g in CONTEXTS:
+            build_recommendations(df_menu, scorer, encoders, uid, "Lama", w, g, t, menu_idx=menu_idx)
+    live = len(uids) / (time.perf_counter() - t0)
+    print(f"Live (build_recommendations x {len(CONTEXTS)} konteks): {live:,.0f} user/detik, 1 proses")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+# ==========================================
+# 📏 BENCHMARK: WAKTU SERVER PER RERUN HALAMAN KASIR
+# ==========================================
+# Jalan headless via AppTest (proses yang sama, cache sudah hangat). Yang diukur waktu eksekusi script
+# di server per interaksi: rerun satu halaman penuh vs rerun fragment (grid menu / keranjang) saja.
+# Jalankan: python benchmarks/bench_rerun.py --db-url sqlite:///resto.db [--runs 30]
+
+
+def grid_fragment_app():
+    import os
+    import streamlit as st
+    from database import make_engine
+    from menu_catalog import MenuCatalog
+    from kasir_view import render_menu_grid
+    if 'cart' not in st.session_state: st.session_state['cart'] = {}
+    df_menu, menu_idx, version = MenuCatalog(make_engine(os.environ['DATABASE_URL'])).refresh()
+    render_menu_grid(df_menu, menu_idx, version)
+
+
+def cart_fragment_app():
+    import os
+    import streamlit as st
+    from database import make_engine
+    from kasir_view import render_cart
+    render_cart(make_engine(os.environ['DATABASE_URL']), "Bench", None, "Bench", "Cerah", "Sendiri", "Siang")
+
+
+def timed_runs(at, action, runs):
+    samples = []
+    for i in range(runs):
+        action(at, i)
+        t0 = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - t0) * 1000)
+        if at.exception: raise RuntimeError(at.exception[0].message)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def add_buttons(at):
+    return [b for b in at.button if b.key and b.key.startswith("add_")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db-url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args(argv)
+    if not args.db_url: parser.error("--db-url (atau DATABASE_URL) wajib diisi")
+    os.environ['DATABASE_URL'] = args.db_url
+    os.chdir(ROOT)
+
+    results = {}
+    page = AppTest.from_file(os.path.join(ROOT, "app_v4.py"), default_timeout=600)
+    page.session_state['page'] = 'kasir_main'
+    page.session_state['cart'] = {}
+    page.run()
+    page.text_input[0].input("Budi").run()  # pelanggan + hero rekomendasi ikut dirender
+    results["Halaman penuh: klik ➕"] = timed_runs(page, lambda at, i: add_buttons(at)[i % 5].click(), args.runs)
+    results["Halaman penuh: ketik cari menu"] = timed_runs(page, lambda at, i: at.text_input[1].input("es" if i % 2 else "ayam"), args.runs)
+
+    grid = AppTest.from_function(grid_fragment_app, default_timeout=600)
+    grid.run()
+    results["Fragment grid: ketik cari menu"] = timed_runs(grid, lambda at, i: at.text_input[0].input("es" if i % 2 else "ayam"), args.runs)
+
+    cart = AppTest.from_function(cart_fragment_app, default_timeout=600)
+    cart.session_state['cart'] = {f"Item {i}": {'qty': 1, 'price': 10000, 'id': i, 'category': 'Makanan'} for i in range(5)}
+    cart.run()
+    results["Fragment keranjang: ganti metode bayar"] = timed_runs(cart, lambda at, i: at.selectbox[0].select(["Tunai", "QRIS"][i % 2]), args.runs)
+
+    for name, (p50, p95) in results.items():
+        print(f"{name:42s} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
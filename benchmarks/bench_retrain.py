@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# ==========================================
+# 📏 BENCHMARK: RETRAINING INKREMENTAL
+# ==========================================
+# Per ukuran histori: buat database SQLite sintetis (benchmarks/datagen.py), salin model live ke folder
+# sementara, lalu ukur model_retrain.train --full (waktu total & baris/detik). Setelah itu tambah
+# --new-orders order baru dan ukur retraining inkremental (cuma order baru yang di-stream).
+# Model live di models/ tidak disentuh.
+# Jalankan: python benchmarks/bench_retrain.py [--sizes 10000,50000,200000] [--users 2000] [--epochs 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default="10000,50000,200000")
+    parser.add_argument('--users', type=int, default=2000, help="Lebih dari vocab model supaya embedding ikut tumbuh")
+    parser.add_argument('--menus', type=int, default=80)
+    parser.add_argument('--new-orders', type=int, default=5000)
+    parser.add_argument('--epochs', type=int, default=1)
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+
+    import model_retrain
+    from database import make_engine
+    from checkout import bulk_ingest
+    from datagen import generate, iter_orders
+
+    print(f"{'orders':>9} | {'full total':>10} {'fit':>8} {'baris/detik':>12} | {'inkremental':>11} {'baris':>7} | vocab user/menu")
+    for n in [int(x) for x in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite:///{tmp}/bench.db")
+            generate(engine, args.menus, args.users, n, reset=True, log=lambda *_: None)
+            paths = {}
+            for key, live in model_retrain.live_paths().items():
+                paths[key] = os.path.join(tmp, os.path.basename(live))
+                shutil.copyfile(live, paths[key])
+            vdir = os.path.join(tmp, 'versions')
+
+            full = model_retrain.train(engine, full=True, epochs=args.epochs, paths=paths, versions_dir=vdir, log=lambda *_: None)
+            rng = np.random.default_rng(1)
+            bulk_ingest(engine, iter_orders(args.new_orders, np.arange(1, args.users + 1), np.arange(1, args.menus + 1), rng))
+            inc = model_retrain.train(engine, epochs=args.epochs, paths=paths, versions_dir=vdir, log=lambda *_: None)
+            engine.dispose()
+            print(f"{n:9,d} | {full['seconds']:9.1f}s {full['fit_seconds']:7.1f}s {full['rows_per_s']:12,.0f} | "
+                  f"{inc['seconds']:10.1f}s {inc['orders']:7,d} | {full['vocab']['user_id']}/{full['vocab']['menu_id']} "
+                  f"(+{full['added']['user_id']}/+{full['added']['menu_id']})")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
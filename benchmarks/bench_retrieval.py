@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ==========================================
+# 📏 BENCHMARK: RETRIEVAL DUA TAHAP vs SCORING PENUH
+# ==========================================
+# Katalog sintetis (nama dari datagen.make_menu, embedding menu = baris model asli + noise) dengan ukuran
+# --menus. Untuk pelanggan + konteks acak, bandingkan build_recommendations di semua menu dengan
+# retrieval (exact / ivf) + build_recommendations di kandidat saja:
+#   recall@n = bagian top-n makanan + minuman versi penuh yang juga muncul di versi dua tahap
+# Di akhir: crossover = ukuran katalog di mana dua tahap mulai lebih cepat dari scoring penuh (interpolasi
+# log antar ukuran yang diukur), dasar default HOLYGRAIL_RETRIEVAL_MIN_MENU.
+# Jalankan: python benchmarks/bench_retrieval.py [--menus 500,1000,2000,5000,20000] [--queries 200] [--k 200]
+
+
+def ms(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def synthetic_catalog(n, scorer, encoders, rng):
+    from datagen import make_menu
+    from fast_encoder import FastEncoder
+    from menu_index import build_menu_index
+    from scoring_engine import NCFScorer
+
+    df_menu = make_menu(n, rng)
+    df_menu.insert(0, 'menu_id', np.arange(1, n + 1))
+    base = scorer.embeddings[1]
+    emb_menu = (base[rng.integers(len(base), size=n)] + rng.normal(0, base.std(), (n, base.shape[1]))).astype(base.dtype)
+    big = NCFScorer([emb_menu if i == 1 else e for i, e in enumerate(scorer.embeddings)], scorer.concat_order, scorer.dense)
+    menu_encoder = FastEncoder(df_menu['menu_id'].astype(str).to_numpy())
+    enc = dict(encoders, menu_id=menu_encoder)
+    return df_menu, build_menu_index(df_menu, menu_encoder=menu_encoder), big, enc
+
+
+def crossover(points):
+    # points = [(n, p_full, p_two)] urut n; None kalau dua tahap tidak pernah lebih cepat di rentang ini
+    prev = None
+    for n, p_full, p_two in points:
+        gap = np.log(p_two / p_full)
+        if gap < 0:
+            if prev is None: return n
+            n0, g0 = prev
+            # Titik gap = 0 di antara dua ukuran (interpolasi di skala log n)
+            return int(round(np.exp(np.log(n0) + (np.log(n) - np.log(n0)) * g0 / (g0 - gap))))
+        prev = (n, gap)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--menus', default="500,1000,2000,5000,20000")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=200, help="Kandidat per kategori")
+    parser.add_argument('--top-n', type=int, default=4)
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+
+    import model_registry
+    from kasir_view import build_recommendations, retrieve_candidates
+    from menu_retrieval import RETRIEVAL_MIN_MENU, MenuRetrievalIndex
+
+    scorer, encoders = model_registry.get_scorer(), model_registry.get_encoders()
+    users = encoders['user_id'].classes_
+    print(f"{'menu':>6} {'mode':>5} | {'recall@' + str(args.top_n):>9} {'kandidat':>8} | {'penuh p50':>9} {'tahap1 p50':>10} {'2 tahap p50':>11} {'speedup':>7} | build index")
+    points = {'exact': [], 'ivf': []}
+    for n in sorted(int(x) for x in args.menus.split(',')):
+        rng = np.random.default_rng(n)
+        df_menu, menu_idx, big, enc = synthetic_catalog(n, scorer, encoders, rng)
+        frame = df_menu.join(menu_idx)
+        queries = [(int(rng.choice(users)), rng.choice(["Cerah", "Hujan"]), rng.choice(["Sendiri", "Keluarga"]), rng.choice(["Pagi", "Siang", "Malam"]))
+                   for _ in range(args.queries)]
+
+        full, t_full = [], []
+        for uid, w, g, t in queries:
+            dt, (food, drink, _) = ms(lambda: build_recommendations(df_menu, big, enc, uid, "Lama", w, g, t, top_n=args.top_n, menu_idx=menu_idx))
+            full.append(set(food['menu_id']) | set(drink['menu_id']))
+            t_full.append(dt)
+
+        for mode in ('exact', 'ivf'):
+            t_build, index = ms(lambda: MenuRetrievalIndex(big, frame, mode=mode))
+            hits = total = 0
+            t_stage1, t_two, n_cand = [], [], []
+            for (uid, w, g, t), want in zip(queries, full):
+                dt1, cand = ms(lambda: retrieve_candidates(df_menu, index, enc, uid, "Lama", w, g, t, k=args.k))
+                dt2, (food, drink, _) = ms(lambda: build_recommendations(cand, big, enc, uid, "Lama", w, g, t, top_n=args.top_n, menu_idx=menu_idx))
+                got = set(food['menu_id']) | set(drink['menu_id'])
+                hits += len(want & got)
+                total += len(want)
+                t_stage1.append(dt1)
+                t_two.append(dt1 + dt2)
+                n_cand.append(len(cand))
+            p_full, p1, p2 = np.median(t_full), np.median(t_stage1), np.median(t_two)
+            points[mode].append((n, p_full, p2))
+            print(f"{n:6d} {mode:>5} | {hits / max(total, 1):9.3f} {np.mean(n_cand):8.0f} | {p_full:7.2f}ms {p1:8.2f}ms {p2:9.2f}ms {p_full / p2:6.1f}x | {t_build:.0f} ms")
+
+    print()
+    for mode, pts in points.items():
+        n_cross = crossover(pts)
+        where = f"~{n_cross} menu" if n_cross else f"tidak tercapai sampai {pts[-1][0]} menu"
+        print(f"crossover {mode:>5}: dua tahap lebih cepat mulai {where}")
+    print(f"HOLYGRAIL_RETRIEVAL_MIN_MENU sekarang {RETRIEVAL_MIN_MENU} ('auto' memakai exact)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
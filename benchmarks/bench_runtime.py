@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ==========================================
+# ⚖️ BENCHMARK RUNTIME: KERAS vs BUNDLE NUMPY
+# ==========================================
+# Tiap backend diukur di proses baru: waktu load, RSS setelah load, latensi per request (1 user x semua menu).
+# Parity skor bundle vs model.predict dicek dulu di proses utama.
+# Jalankan: python benchmarks/bench_runtime.py [--runs 300]
+
+PROBE = """
+import os, sys, time, json
+import numpy as np
+t0 = time.perf_counter()
+import model_registry as mr
+mode = {mode!r}
+enc = mr.get_encoders()
+if mode == "keras-predict":
+    model = mr.get_model()
+    n = len(enc["menu_id"].classes_)
+    menus = np.arange(n)
+    fn = lambda: model.predict([np.zeros(n), menus, np.zeros(n), np.zeros(n), np.zeros(n)], verbose=0)
+else:
+    scorer = mr.get_scorer()
+    menus = np.arange(scorer.vocab_sizes["menu"])
+    fn = lambda: scorer.score(0, menus, 0, 0, 0)
+load_s = time.perf_counter() - t0
+for _ in range(5): fn()
+samples = []
+for _ in range({runs}):
+    t = time.perf_counter(); fn(); samples.append((time.perf_counter() - t) * 1000)
+print(json.dumps({{"load_s": load_s, "rss_mb": mr.load_report()["_process"]["rss_mb"],
+                  "tf": "tensorflow" in sys.modules, "sklearn": "sklearn" in sys.modules,
+                  "p50": float(np.percentile(samples, 50)), "p99": float(np.percentile(samples, 99))}}))
+"""
+
+BACKENDS = [
+    ("keras-predict", "keras"),   # jalur lama: model.predict
+    ("keras-numpy", "keras"),     # bobot dari .h5, scoring NumPy
+    ("bundle", "numpy"),          # bundle .npz + vocab JSON, tanpa TF
+]
+
+
+def check_bundle_parity():
+    import tensorflow as tf
+    import model_bundle
+    from bench_scoring import check_parity
+    model = tf.keras.models.load_model(os.path.join(ROOT, "models", "context_model.h5"), compile=False)
+    scorer, _, _ = model_bundle.load_bundle(os.path.join(ROOT, model_bundle.BUNDLE_PATH), os.path.join(ROOT, model_bundle.VOCAB_PATH))
+    return check_parity(model, scorer)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=300)
+    args = parser.parse_args()
+
+    worst = check_bundle_parity()
+    print(f"✅ Parity bundle vs predict OK (selisih maks {worst:.2e})\n")
+
+    print(f"{'Backend':<16}{'load (s)':>10}{'RSS (MB)':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'TF?':>6}{'sklearn?':>10}")
+    for name, runtime in BACKENDS:
+        env = dict(os.environ, HOLYGRAIL_RUNTIME=runtime, PYTHONPATH=ROOT)
+        out = subprocess.run([sys.executable, "-c", PROBE.format(mode=name, runs=args.runs)], cwd=ROOT, env=env, capture_output=True, text=True)
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines:
+            print(f"{name:<16} GAGAL: {out.stderr.strip().splitlines()[-1] if out.stderr else '?'}")
+            continue
+        r = json.loads(lines[-1])
+        print(f"{name:<16}{r['load_s']:>10.2f}{r['rss_mb']:>10.0f}{r['p50']:>10.3f}{r['p99']:>10.3f}{'ya' if r['tf'] else 'tidak':>6}{'ya' if r['sklearn'] else 'tidak':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tensorflow as tf
+from scoring_engine import NCFScorer
+
+# ==========================================
+# 📏 BENCHMARK: model.predict vs NCFScorer
+# ==========================================
+# Jalankan: python benchmarks/bench_scoring.py [--runs 200] [--users 64]
+
+def percentiles(samples_ms):
+    arr = np.asarray(samples_ms)
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+def timeit(fn, runs, warmup=5):
+    for _ in range(warmup): fn()
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return percentiles(samples)
+
+def check_parity(model, scorer, n_users=32, atol=1e-4):
+    sizes = scorer.vocab_sizes
+    rng = np.random.default_rng(0)
+    menus = np.arange(sizes["menu"])
+    worst = 0.0
+    for u in rng.integers(0, sizes["user"], n_users):
+        w, t, g = rng.integers(0, sizes["weather"]), rng.integers(0, sizes["time_of_day"]), rng.integers(0, sizes["group_size"])
+        n = len(menus)
+        ref = model.predict([np.full(n, u), menus, np.full(n, w), np.full(n, t), np.full(n, g)], verbose=0).flatten()
+        got = scorer.score(u, menus, w, t, g)
+        got_mat = scorer.score_matrix([u], menus, w, t, g)[0]
+        worst = max(worst, np.abs(ref - got).max(), np.abs(ref - got_mat).max())
+    assert worst < atol, f"Parity GAGAL: selisih maks {worst:.2e}"
+    return worst
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(ROOT, "models", "context_model.h5"))
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--users", type=int, default=64)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    t0 = time.perf_counter()
+    scorer = NCFScorer.from_keras(model)
+    print(f"Ekstrak bobot: {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    worst = check_parity(model, scorer)
+    print(f"✅ Parity OK (selisih maks vs predict: {worst:.2e})")
+
+    sizes = scorer.vocab_sizes
+    menus = np.arange(sizes["menu"])
+    n = len(menus)
+    users = np.arange(min(args.users, sizes["user"]))
+
+    rows = [
+        ("model.predict (1 user)", lambda: model.predict([np.zeros(n), menus, np.zeros(n), np.zeros(n), np.zeros(n)], verbose=0)),
+        ("NCFScorer.score (1 user)", lambda: scorer.score(0, menus, 0, 0, 0)),
+        (f"model.predict ({len(users)} user)", lambda: model.predict([np.repeat(users, n), np.tile(menus, len(users)), np.zeros(n * len(users)), np.zeros(n * len(users)), np.zeros(n * len(users))], verbose=0)),
+        (f"NCFScorer.score_matrix ({len(users)} user)", lambda: scorer.score_matrix(users, menus, 0, 0, 0)),
+    ]
+    print(f"\n{'Skenario':<38}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for name, fn in rows:
+        p50, p99 = timeit(fn, args.runs)
+        print(f"{name:<38}{p50:>10.3f}{p99:>10.3f}")
+
+if __name__ == "__main__":
+    main()
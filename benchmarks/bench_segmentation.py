@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from segmentation import CustomerSegments, KMeansSegmenter, assign_tiers, tier_labels
+
+# ==========================================
+# 📏 BENCHMARK: segmentasi pelanggan
+# ==========================================
+# 1) rfm.apply per baris (versi lama) vs np.digitize, di memori
+# 2) KMeans predict per batch
+# 3) Kalau --db-url diisi: refresh dingin vs refresh inkremental setelah beberapa checkout
+# Jalankan: python benchmarks/bench_segmentation.py [--customers 200000] [--db-url sqlite:////tmp/bench.db]
+
+
+def old_tier(row):
+    val = row['Total_Belanja']
+    if val >= 10_000_000: return '1. 💎 Diamond (VVIP)'
+    elif val >= 4_500_000: return '2. 👑 Platinum (High)'
+    elif val >= 3_000_000: return '3. 🥇 Gold (Mid-High)'
+    elif val >= 1_000_000: return '4. 🥈 Silver (Mid-Low)'
+    else: return '5. 🥉 Bronze (Low)'
+
+
+def ms(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--customers', type=int, default=200_000)
+    parser.add_argument('--db-url', default=None)
+    parser.add_argument('--checkouts', type=int, default=20)
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+
+    rng = np.random.default_rng(0)
+    rfm = pd.DataFrame({'Nama': [f"C{i}" for i in range(args.customers)],
+                        'Total_Belanja': rng.lognormal(14, 1.0, args.customers).round(-2),
+                        'Jumlah_Order': rng.integers(1, 60, args.customers)})
+    t_apply, old = ms(lambda: rfm.apply(old_tier, axis=1))
+    t_vec, new = ms(lambda: tier_labels(assign_tiers(rfm['Total_Belanja'])))
+    assert (old.to_numpy() == new).all(), "hasil tier beda dengan versi lama"
+    print(f"{args.customers} pelanggan  apply: {t_apply:8.1f} ms   digitize: {t_vec:6.2f} ms   ({t_apply / max(t_vec, 1e-9):,.0f}x)")
+
+    km = KMeansSegmenter.load()
+    if km is not None:
+        feats = pd.DataFrame({'total_spend': rfm['Total_Belanja'] / 10, 'frequency': rfm['Jumlah_Order'], 'avg_rating': 4.0})
+        t_km, codes = ms(lambda: km.predict(feats))
+        print(f"KMeans predict (batch {km.batch_size}): {t_km:8.1f} ms   ({args.customers / t_km * 1000:,.0f} pelanggan/detik)")
+
+    if args.db_url:
+        from database import make_engine
+        from checkout import save_checkout
+        from sqlalchemy import text
+        engine = make_engine(args.db_url)
+        seg = CustomerSegments(engine, kmeans=km, ttl_seconds=0)
+        t_cold, _ = ms(lambda: seg.refresh(force=True))
+        print(f"Refresh dingin: {t_cold:8.1f} ms   ({seg.last_changed} pelanggan)")
+        with engine.connect() as conn:
+            users = [r[0] for r in conn.execute(text("SELECT user_id FROM users ORDER BY user_id LIMIT 1000"))]
+            menu_id = conn.execute(text("SELECT MIN(menu_id) FROM menu")).scalar()
+        for uid in rng.choice(users, args.checkouts):
+            save_checkout(engine, int(uid), "Bench", {"x": {"id": int(menu_id), "qty": 1, "price": 10000}}, "Cerah", "Sendiri", "Siang")
+        time.sleep(0.01)
+        t_inc, _ = ms(lambda: seg.refresh(force=True))
+        print(f"Refresh inkremental: {t_inc:8.1f} ms   ({seg.last_changed} pelanggan dihitung ulang dari {len(seg.customers)})")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
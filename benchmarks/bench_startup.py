@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ==========================================
+# 🚦 BENCHMARK COLD START PER ROUTE
+# ==========================================
+# Tiap pengukuran jalan di proses Python baru (cold start beneran), lalu render app_v4 headless via AppTest.
+# Jalankan: python benchmarks/bench_startup.py [--db-url sqlite:///resto.db] [--repeat 3]
+
+IMPORT_PROBE = """
+import time, json, sys
+t0 = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - t0}}))
+"""
+
+ROUTE_PROBE = """
+import os, sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.join({root!r}, "app_v4.py"), default_timeout=600)
+at.session_state["page"] = {route!r}
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+rss = 0.0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"): rss = int(line.split()[1]) / 1024
+print(json.dumps({{
+    "import_streamlit_s": t1 - t0,
+    "first_render_s": t2 - t1,
+    "tf_loaded": "tensorflow" in sys.modules,
+    "rss_mb": rss,
+    "errors": [e.message for e in at.exception],
+}}))
+"""
+
+ROUTES = ["landing", "admin_dashboard", "kasir_main"]
+
+
+def run_probe(code, env):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if not lines: raise RuntimeError(out.stderr[-2000:])
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default=None, help="Override DATABASE_URL (misal sqlite:///resto.db)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    env.pop("HOLYGRAIL_WARMUP", None)
+    if args.db_url: env["DATABASE_URL"] = args.db_url
+
+    print(f"{'Import':<22}{'detik':>10}")
+    for module in ["pandas", "streamlit", "tensorflow", "kasir_view", "admin_view"]:
+        secs = min(run_probe(IMPORT_PROBE.format(module=module), env)["seconds"] for _ in range(args.repeat))
+        print(f"{module:<22}{secs:>10.2f}")
+
+    print(f"\n{'Route':<18}{'first render (s)':>18}{'RSS (MB)':>10}{'TF?':>6}")
+    for route in ROUTES:
+        runs = [run_probe(ROUTE_PROBE.format(root=ROOT, route=route), env) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["first_render_s"])
+        print(f"{route:<18}{best['first_render_s']:>18.2f}{best['rss_mb']:>10.0f}{'ya' if best['tf_loaded'] else 'tidak':>6}")
+        for err in best["errors"]: print(f"   ⚠️ {err.splitlines()[0][:100]}")
+
+
+if __name__ == "__main__":
+    main()
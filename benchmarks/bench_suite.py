@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.engine import make_url
+
+from database import make_engine
+from datagen import SCALES, generate
+
+# ==========================================
+# 🧪 BENCHMARK SUITE (DATA SINTETIS, JALUR KODE ASLI)
+# ==========================================
+# Per skala: isi database (datagen.py), lalu ukur jalur yang dipakai app:
+#   - rekomendasi  : kasir_view.build_recommendations (scorer + boost + top-k) dengan katalog menu asli
+#   - transaksi    : load get_data_transaksi (IncrementalAnalytics / SqlAnalytics, cold + inkremental)
+#   - admin        : agregasi show_admin_dashboard (best_seller, rfm, hourly_sales, top_menu)
+#   - checkout     : checkout.save_checkout, sekuensial & beberapa thread (rebutan pool), plus journal write-behind
+# Hasil dicetak sebagai tabel dan di-append ke JSONL (--out) supaya kurva antar skala/commit bisa dibandingkan.
+#
+# Database benchmark HARUS terpisah dari database app: --db-url wajib (tidak membaca DATABASE_URL), tabel
+# menu/users/orders baru di-DROP kalau --reset, dan URL selain SQLite ditolak tanpa --allow-non-sqlite.
+#
+# Jalankan: python benchmarks/bench_suite.py --db-url sqlite:////tmp/bench.db --scales small --reset
+#           python benchmarks/bench_suite.py --db-url postgresql://.../bench_db --allow-non-sqlite --reset --scales 70:1000:10000,500:100000:1000000
+
+CONTEXTS = [(w, g, t) for w in ("Cerah", "Hujan") for g in ("Sendiri", "Keluarga") for t in ("Pagi", "Siang", "Malam")]
+
+
+def parse_scales(spec):
+    out = []
+    for part in spec.split(','):
+        if part in SCALES: out.append((part, SCALES[part]))
+        else:
+            m, u, o = (int(x) for x in part.split(':'))
+            out.append((part, {"menus": m, "users": u, "orders": o}))
+    return out
+
+
+def latency(samples_ms):
+    arr = np.asarray(samples_ms, dtype=float)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"n": len(arr), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "per_s": 1000.0 / arr.mean() if arr.mean() > 0 else 0.0}
+
+
+def bench_recommendations(engine, runs, rng):
+    import model_registry
+    from kasir_view import build_recommendations
+    from menu_catalog import MenuCatalog
+    encoders, scorer = model_registry.get_encoders(), model_registry.get_scorer()
+    if encoders is None or scorer is None: return {}
+    df_menu, menu_idx, _ = MenuCatalog(engine, menu_encoder=lambda: encoders['menu_id']).refresh()
+    with engine.connect() as conn:
+        from sqlalchemy import text
+        user_ids = [r[0] for r in conn.execute(text("SELECT user_id FROM users ORDER BY user_id LIMIT 5000"))]
+    samples = []
+    for i in range(runs):
+        w, g, t = CONTEXTS[i % len(CONTEXTS)]
+        uid = int(rng.choice(user_ids)) if user_ids and i % 3 else None
+        t0 = time.perf_counter()
+        build_recommendations(df_menu, scorer, encoders, uid, "Lama" if uid else "Baru", w, g, t, menu_idx=menu_idx)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"recommendations": latency(samples)}
+
+
+def bench_transactions(engine, runs):
+    from analytics import IncrementalAnalytics
+    from analytics_sql import SqlAnalytics
+    out = {}
+    t0 = time.perf_counter()
+    inc = IncrementalAnalytics(engine, ttl_seconds=0)
+    stats = inc.refresh(force=True)
+    cold = time.perf_counter() - t0
+    out["trx_load_cold"] = {"n": 1, "p50_ms": cold * 1000, "rows": stats.order_count, "rows_per_s": stats.order_count / cold if cold else 0}
+    out["trx_refresh_incremental"] = latency([_time_ms(lambda: inc.refresh(force=True)) for _ in range(runs)])
+
+    admin = {
+        "best_seller": lambda: stats.best_seller(), "rfm": lambda: stats.rfm(),
+        "hourly_sales": lambda: stats.hourly_sales(), "top_menu": lambda: (stats.top_menu(False), stats.top_menu(True)),
+    }
+    for name, fn in admin.items(): out[f"admin_{name}"] = latency([_time_ms(fn) for _ in range(runs)])
+
+    if engine.dialect.name == 'postgresql':
+        sql = SqlAnalytics(engine, ttl_seconds=0)
+        out["trx_sql_groupby"] = latency([_time_ms(lambda: sql.refresh(force=True)) for _ in range(max(3, runs // 10))])
+    return out
+
+
+def bench_checkout(engine, runs, threads, rng):
+    from checkout import save_checkout
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        menu_ids = [r[0] for r in conn.execute(text("SELECT menu_id FROM menu"))]
+        user_ids = [r[0] for r in conn.execute(text("SELECT user_id FROM users ORDER BY user_id LIMIT 5000"))]
+
+    def one(local_rng):
+        cart = {f"m{m}": {"id": int(m), "qty": int(local_rng.integers(1, 4)), "price": 10000} for m in local_rng.choice(menu_ids, 3)}
+        uid = int(local_rng.choice(user_ids)) if local_rng.random() < 0.8 else None
+        t0 = time.perf_counter()
+        save_checkout(engine, uid, "Bench Baru", cart, "Cerah", "Sendiri", "Siang")
+        return (time.perf_counter() - t0) * 1000
+
+    out = {"checkout_seq": latency([one(rng) for _ in range(runs)])}
+    if threads > 1:
+        samples, lock = [], threading.Lock()
+
+        def worker(seed):
+            local = np.random.default_rng(seed)
+            res = [one(local) for _ in range(runs)]
+            with lock: samples.extend(res)
+
+        t0 = time.perf_counter()
+        ts = [threading.Thread(target=worker, args=(s,)) for s in range(threads)]
+        for t in ts: t.start()
+        for t in ts: t.join()
+        wall = time.perf_counter() - t0
+        out[f"checkout_{threads}_threads"] = {**latency(samples), "per_s": len(samples) / wall}
+
+    # Write-behind: latensi yang dirasakan kasir (append ke journal lokal) + waktu menguras ke database
+    from checkout_journal import CheckoutJournal
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = CheckoutJournal(engine, path=os.path.join(tmp, "journal.db"))
+        cart = {f"m{m}": {"id": int(m), "qty": 1, "price": 10000} for m in menu_ids[:3]}
+        out["checkout_journal_append"] = latency([_time_ms(lambda: journal.append(None, "Bench Journal", cart, "Cerah", "Sendiri", "Siang")) for _ in range(runs)])
+        t0 = time.perf_counter()
+        journal.drain()
+        dt = time.perf_counter() - t0
+        out["checkout_journal_drain"] = {"n": 1, "p50_ms": dt * 1000, "rows": runs, "rows_per_s": runs / dt if dt else 0}
+        journal.close()
+    return out
+
+
+def _time_ms(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db-url', required=True, help="Database KHUSUS benchmark (bukan database app)")
+    parser.add_argument('--scales', default='small', help="small,medium,large atau menus:users:orders dipisah koma")
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-generate', action='store_true', help="Pakai data yang sudah ada di database")
+    parser.add_argument('--reset', action='store_true', help="DROP tabel menu/users/orders sebelum generate tiap skala (wajib kalau skala > 1)")
+    parser.add_argument('--allow-non-sqlite', action='store_true', help="Izinkan --db-url selain SQLite (pastikan bukan database produksi)")
+    parser.add_argument('--out', default=os.path.join('logs', 'bench_suite.jsonl'))
+    args = parser.parse_args(argv)
+    if make_url(args.db_url).get_backend_name() != 'sqlite' and not args.allow_non_sqlite:
+        parser.error("--db-url bukan SQLite: tambahkan --allow-non-sqlite kalau memang database khusus benchmark")
+    # generate() append ke tabel yang ada: tanpa --reset skala berikutnya menumpuk di atas data skala sebelumnya,
+    # dan --skip-generate mengukur data yang sama untuk semua label -> angka per skala salah label
+    scales = parse_scales(args.scales)
+    if len(scales) > 1 and (args.skip_generate or not args.reset):
+        parser.error("Lebih dari satu skala butuh --reset (tiap skala mulai dari tabel kosong) dan tanpa --skip-generate")
+    os.chdir(ROOT)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+
+    engine = make_engine(args.db_url)
+    run_at = datetime.now().isoformat(timespec='seconds')
+    for label, size in scales:
+        gen = {} if args.skip_generate else generate(engine, seed=args.seed, reset=args.reset, **size)
+        rng = np.random.default_rng(args.seed)
+        results = {}
+        results.update(bench_recommendations(engine, args.runs, rng))
+        results.update(bench_transactions(engine, max(5, args.runs // 10)))
+        results.update(bench_checkout(engine, max(5, args.runs // 5), args.threads, rng))
+
+        print(f"\n=== skala {label} ({size['menus']} menu, {size['users']} user, {size['orders']} order) · {engine.dialect.name} ===")
+        for name, r in results.items():
+            extra = f"   {r['rows_per_s']:,.0f} baris/detik" if 'rows_per_s' in r else f"   {r.get('per_s', 0):,.1f}/detik"
+            p95 = f"p95 {r['p95_ms']:9.2f}  p99 {r['p99_ms']:9.2f}" if 'p95_ms' in r else " " * 29
+            print(f"{name:28s} p50 {r['p50_ms']:9.2f} ms  {p95}{extra}")
+        with open(args.out, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"run_at": run_at, "scale": label, **size, "dialect": engine.dialect.name, "generate": gen, "results": results}, default=float) + "\n")
+    print(f"\nHasil di-append ke {args.out}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
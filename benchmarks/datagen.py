@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import make_engine
+from checkout import ORDER_COLUMNS, bulk_ingest
+
+# ==========================================
+# 🏭 GENERATOR DATA RESTORAN SINTETIS
+# ==========================================
+# Isi tabel menu, users, orders dengan skala yang bisa diatur, deterministik per --seed.
+# Order ditulis lewat checkout.bulk_ingest (COPY di Postgres), jadi jalur tulis yang diukur sama dengan produksi.
+#
+# Jalankan: python benchmarks/datagen.py --db-url sqlite:///bench.db --scale small --reset
+#           python benchmarks/datagen.py --db-url postgresql://... --allow-non-sqlite --menus 5000 --users 1000000 --orders 50000000
+# --db-url wajib (tidak ikut DATABASE_URL app) karena --reset men-DROP tabel.
+
+SCALES = {
+    "small":  {"menus": 70,   "users": 1_000,     "orders": 10_000},
+    "medium": {"menus": 500,  "users": 100_000,   "orders": 1_000_000},
+    "large":  {"menus": 5000, "users": 1_000_000, "orders": 50_000_000},
+}
+
+BASE_MENU = {
+    "Paket Jumbo": ["Paket Hemat", "Bucket Ayam", "Platter Mix", "Paket Keluarga", "Tumpeng Mini"],
+    "Kuah": ["Soto Ayam", "Sop Buntut", "Rawon", "Bakso Urat", "Ramen Pedas", "Mie Godog", "Seblak Ceker"],
+    "Makanan": ["Nasi Goreng", "Burger Sapi", "Ayam Geprek", "Pizza Keju", "Sate Kambing", "Gurame Bakar", "Martabak Manis", "Gado Gado"],
+    "Minuman": ["Es Teh Manis", "Jus Alpukat", "Kopi Hitam", "Wedang Jahe", "Hot Chocolate", "Coca Cola", "Lemon Tea Cold", "Bandrek"],
+}
+FIRST_NAMES = ['Budi', 'Siti', 'Agus', 'Dewi', 'Rizky', 'Putri', 'Eka', 'Wayan', 'Ayu', 'Andi', 'Rina', 'Joko', 'José', 'Ratna']
+LAST_NAMES = ['Santoso', 'Wijaya', 'Lestari', 'Hidayat', 'Nugroho', 'Kusuma', 'Saputra', 'Pratama', 'Sari', 'Gunawan']
+WEATHERS = np.array(['Cerah', 'Hujan'])
+GROUPS = np.array(['Sendiri', 'Keluarga'])
+# Jam order: ramai makan siang & makan malam
+HOUR_WEIGHTS = np.array([0, 0, 0, 0, 0, 0, 1, 2, 3, 3, 4, 8, 10, 8, 4, 3, 3, 5, 9, 10, 7, 4, 2, 1], dtype=float)
+
+SCHEMA = {
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS menu (menu_id SERIAL PRIMARY KEY, menu_name TEXT, price INTEGER, category TEXT)",
+        "CREATE TABLE IF NOT EXISTS users (user_id SERIAL PRIMARY KEY, name TEXT, favorite_category TEXT)",
+        "CREATE TABLE IF NOT EXISTS orders (order_id BIGSERIAL PRIMARY KEY, user_id INTEGER REFERENCES users, menu_id INTEGER REFERENCES menu, "
+        "rating INTEGER, weather TEXT, group_size TEXT, time_of_day TEXT, timestamp TIMESTAMP)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_timestamp ON orders (timestamp)",
+    ],
+    'default': [
+        "CREATE TABLE IF NOT EXISTS menu (menu_id INTEGER PRIMARY KEY, menu_name TEXT, price INTEGER, category TEXT)",
+        "CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY, name TEXT, favorite_category TEXT)",
+        "CREATE TABLE IF NOT EXISTS orders (order_id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(user_id), menu_id INTEGER REFERENCES menu(menu_id), "
+        "rating INTEGER, weather TEXT, group_size TEXT, time_of_day TEXT, timestamp TIMESTAMP)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_timestamp ON orders (timestamp)",
+    ],
+}
+
+
+def time_of_day(hours):
+    # Sama dengan kasir_view.get_time_of_day
+    return np.where((hours >= 5) & (hours < 11), 'Pagi', np.where((hours >= 11) & (hours < 18), 'Siang', 'Malam'))
+
+
+def make_menu(n, rng):
+    cats = list(BASE_MENU)
+    rows = []
+    for i in range(n):
+        cat = cats[i % len(cats)]
+        base = BASE_MENU[cat][(i // len(cats)) % len(BASE_MENU[cat])]
+        variant = i // sum(len(v) for v in BASE_MENU.values())
+        rows.append({"menu_name": base if variant == 0 else f"{base} {variant + 1}", "price": int(rng.integers(8, 120)) * 500, "category": cat})
+    return pd.DataFrame(rows)
+
+
+def make_users(start, n, rng):
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    names = [f"{f} {l} {start + i}" for i, (f, l) in enumerate(zip(first, last))]
+    return pd.DataFrame({"name": names, "favorite_category": "Umum"})
+
+
+def iter_orders(n, user_ids, menu_ids, rng, days=180, chunk=100_000, end=None):
+    # Popularitas user & menu miring (sebagian kecil pelanggan/menu menyumbang sebagian besar order)
+    end = end or datetime.now().replace(microsecond=0) - timedelta(minutes=10)
+    start = end - timedelta(days=days)
+    u_w = 1.0 / np.arange(1, len(user_ids) + 1) ** 0.8
+    m_w = 1.0 / np.arange(1, len(menu_ids) + 1) ** 0.6
+    u_p, m_p = u_w / u_w.sum(), m_w / m_w.sum()
+    h_p = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+    done = 0
+    while done < n:
+        k = min(chunk, n - done)
+        day = np.sort(rng.integers(0, days, k))
+        hour = rng.choice(24, k, p=h_p)
+        secs = day * 86400 + hour * 3600 + rng.integers(0, 3600, k)
+        ts = pd.to_datetime(start) + pd.to_timedelta(secs, unit='s')
+        frame = pd.DataFrame({
+            "user_id": rng.choice(user_ids, k, p=u_p), "menu_id": rng.choice(menu_ids, k, p=m_p),
+            "rating": rng.integers(3, 6, k), "weather": rng.choice(WEATHERS, k, p=[0.7, 0.3]),
+            "group_size": rng.choice(GROUPS, k, p=[0.6, 0.4]), "time_of_day": time_of_day(hour), "timestamp": ts,
+        })
+        for rec in frame[ORDER_COLUMNS].to_dict('records'):
+            rec['user_id'], rec['menu_id'], rec['rating'] = int(rec['user_id']), int(rec['menu_id']), int(rec['rating'])
+            rec['timestamp'] = rec['timestamp'].to_pydatetime()
+            yield rec
+        done += k
+
+
+def create_schema(engine, reset=False):
+    ddl = SCHEMA['postgresql' if engine.dialect.name == 'postgresql' else 'default']
+    with engine.begin() as conn:
+        if reset:
+            for t in ('orders', 'users', 'menu'):
+                conn.execute(text(f"DROP TABLE IF EXISTS {t}{' CASCADE' if engine.dialect.name == 'postgresql' else ''}"))
+        for stmt in ddl: conn.execute(text(stmt))
+
+
+def generate(engine, menus, users, orders, seed=0, reset=False, days=180, log=print):
+    # Return dict jumlah baris & detik per tabel
+    rng = np.random.default_rng(seed)
+    report = {}
+    create_schema(engine, reset=reset)
+
+    t0 = time.perf_counter()
+    make_menu(menus, rng).to_sql("menu", engine, if_exists="append", index=False, chunksize=10_000)
+    report["menu_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    step = 100_000
+    for start in range(0, users, step):
+        make_users(start, min(step, users - start), rng).to_sql("users", engine, if_exists="append", index=False, chunksize=10_000, method="multi")
+    report["users_s"] = time.perf_counter() - t0
+
+    with engine.connect() as conn:
+        menu_ids = np.array([r[0] for r in conn.execute(text("SELECT menu_id FROM menu ORDER BY menu_id"))])
+        user_ids = np.array([r[0] for r in conn.execute(text("SELECT user_id FROM users ORDER BY user_id"))])
+    rng.shuffle(menu_ids)
+    rng.shuffle(user_ids)
+
+    t0 = time.perf_counter()
+    report["orders"] = bulk_ingest(engine, iter_orders(orders, user_ids, menu_ids, rng, days=days))
+    report["orders_s"] = time.perf_counter() - t0
+    report.update(menus=menus, users=users)
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE menu")); conn.execute(text("ANALYZE users")); conn.execute(text("ANALYZE orders"))
+    log(f"✅ menu {menus} ({report['menu_s']:.1f} s) · users {users} ({report['users_s']:.1f} s) · "
+        f"orders {report['orders']} ({report['orders_s']:.1f} s, {report['orders'] / max(report['orders_s'], 1e-9):,.0f} baris/detik)")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Isi database dengan data restoran sintetis")
+    parser.add_argument('--db-url', required=True, help="Database KHUSUS benchmark (bukan database app)")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--menus', type=int)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--orders', type=int)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reset', action='store_true', help="DROP tabel menu/users/orders dulu")
+    parser.add_argument('--allow-non-sqlite', action='store_true', help="Izinkan --db-url selain SQLite (pastikan bukan database produksi)")
+    args = parser.parse_args(argv)
+    if make_url(args.db_url).get_backend_name() != 'sqlite' and not args.allow_non_sqlite:
+        parser.error("--db-url bukan SQLite: tambahkan --allow-non-sqlite kalau memang database khusus benchmark")
+
+    size = {k: getattr(args, k) or v for k, v in SCALES[args.scale].items()}
+    generate(make_engine(args.db_url), seed=args.seed, reset=args.reset, days=args.days, **size)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import time
+import bisect
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+# ==========================================
+# 👤 PENCARIAN MEMBER DI KASIR
+# ==========================================
+# Tiap ketikan nama = rerun Streamlit = query ILIKE baru. Hasil disimpan sebentar (TTL) per kata kunci,
+# dan kalau kata kunci yang lebih pendek sudah pernah dicari dengan hasil < LIMIT (berarti lengkap),
+# hasil untuk kata kunci yang lebih panjang cukup difilter dari situ tanpa ke database.
+
+SEARCH_LIMIT = 5
+
+# Statement konstan: dikompilasi sekali oleh SQLAlchemy (compiled cache), dipakai ulang tiap ketikan.
+# Dengan index trigram (sql/migrations/001_users_name_trgm.sql) Postgres tidak perlu sequential scan.
+SEARCH_USERS_PG = text(r"SELECT user_id, name FROM users WHERE name ILIKE :nm ESCAPE '\' LIMIT :lim")
+SEARCH_USERS_GENERIC = text(r"SELECT user_id, name FROM users WHERE LOWER(name) LIKE LOWER(:nm) ESCAPE '\' LIMIT :lim")
+
+
+def _escape_like(s):
+    return s.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class SearchResultCache:
+    def __init__(self, ttl_seconds=30, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry):
+        return time.monotonic() - entry[0] < self.ttl_seconds
+
+    def get(self, key, limit=SEARCH_LIMIT):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and self._fresh(entry):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            # Turunan dari kata kunci lebih pendek yang hasilnya sudah lengkap
+            for k, (ts, rows) in reversed(self._data.items()):
+                if k in key and len(rows) < limit and self._fresh((ts, rows)):
+                    self.hits += 1
+                    return [r for r in rows if key in str(r[1]).lower()][:limit]
+            self.misses += 1
+            return None
+
+    def put(self, key, rows):
+        with self._lock:
+            self._data[key] = (time.monotonic(), rows)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def search_customers(engine, query, cache=None, limit=SEARCH_LIMIT):
+    key = query.strip().lower()
+    if not key: return []
+    if cache is not None:
+        rows = cache.get(key, limit)
+        if rows is not None: return rows
+    stmt = SEARCH_USERS_PG if engine.dialect.name == 'postgresql' else SEARCH_USERS_GENERIC
+    with engine.connect() as conn:
+        rows = [tuple(r) for r in conn.execute(stmt, {"nm": f"%{_escape_like(key)}%", "lim": limit}).fetchall()]
+    if cache is not None: cache.put(key, rows)
+    return rows
+
+
+# ==========================================
+# ⚡ INDEX NAMA MEMBER DI MEMORI (AUTOCOMPLETE)
+# ==========================================
+# Semua (user_id, nama) dimuat sekali, lalu pencarian jalan di memori tanpa round trip ke database.
+# Nama dinormalisasi (aksen dibuang + casefold) jadi "jose" ketemu "José".
+# Urutan hasil: nama yang diawali kata kunci dulu (urut abjad), lalu yang memuat kata kunci (urut ID).
+# Member baru dari checkout masuk lewat add(); member dari kasir/proses lain ditarik sync() per user_id.
+
+LOAD_USERS = text("SELECT user_id, name FROM users WHERE user_id > :hwm ORDER BY user_id")
+
+
+def normalize_name(name):
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().replace('\n', ' ')
+
+
+class CustomerNameIndex:
+    def __init__(self, sync_seconds=60):
+        self.sync_seconds = sync_seconds
+        self.hits = 0
+        self.misses = 0
+        self.high_water_mark = 0
+        self.last_sync = 0.0
+        self._ids, self._names, self._starts = [], [], []
+        self._blob = ''          # semua nama ternormalisasi digabung '\n', untuk str.find (substring)
+        self._sorted = []        # (nama ternormalisasi, posisi), untuk bisect (prefix)
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _extend(self, rows):
+        # Batch: gabung string & sort sekali, bukan per baris (muat awal puluhan ribu nama)
+        pieces, fresh = [], []
+        offset = len(self._blob)
+        for user_id, name in rows:
+            if user_id in self._seen: continue
+            norm = normalize_name(name)
+            self._seen.add(user_id)
+            fresh.append((norm, len(self._ids)))
+            self._ids.append(user_id)
+            self._names.append(name)
+            self._starts.append(offset)
+            pieces.append(norm + '\n')
+            offset += len(norm) + 1
+            if isinstance(user_id, int): self.high_water_mark = max(self.high_water_mark, user_id)
+        if len(fresh) == 1: bisect.insort(self._sorted, fresh[0])
+        elif fresh: self._sorted = sorted(self._sorted + fresh)
+        self._blob += ''.join(pieces)
+        return len(fresh)
+
+    def add(self, user_id, name):
+        return self.add_many([(user_id, name)])
+
+    def add_many(self, rows):
+        with self._lock:
+            return self._extend(rows)
+
+    def sync(self, engine, force=False):
+        # Tarik user yang lebih baru dari high-water-mark (muat penuh saat pertama kali)
+        if not force and time.monotonic() - self.last_sync < self.sync_seconds:
+            return 0
+        with engine.connect() as conn:
+            rows = conn.execute(LOAD_USERS, {"hwm": self.high_water_mark}).fetchall()
+        self.add_many(rows)
+        self.last_sync = time.monotonic()
+        return len(rows)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        q = normalize_name(query).strip()
+        if not q: return []
+        with self._lock:
+            found = []
+            i = bisect.bisect_left(self._sorted, (q,))
+            while i < len(self._sorted) and len(found) < limit and self._sorted[i][0].startswith(q):
+                found.append(self._sorted[i][1])
+                i += 1
+            prefix = set(found)
+            start = self._blob.find(q)
+            while start >= 0 and len(found) < limit:
+                pos = bisect.bisect_right(self._starts, start) - 1
+                if pos not in prefix: found.append(pos)
+                nxt = self._starts[pos + 1] if pos + 1 < len(self._starts) else len(self._blob)
+                start = self._blob.find(q, nxt)
+            if found: self.hits += 1
+            else: self.misses += 1
+            return [(self._ids[p], self._names[p]) for p in found]
+
+    def stats(self):
+        return {"users": len(self._ids), "hits": self.hits, "misses": self.misses, "high_water_mark": self.high_water_mark}
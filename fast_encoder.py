@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 🔎 FAST ENCODER (LOOKUP O(1))
+# ==========================================
+# LabelEncoder.transform lewat validasi + sort sklearn tiap panggilan, dan `x in enc.classes_`
+# itu scan linear array NumPy. Di sini classes_ dikompilasi SEKALI jadi dict (satu nilai) dan
+# hash index pandas (banyak nilai). Kunci disimpan sebagai string, jadi 5 dan "5" sama saja.
+
+_MISSING = object()
+
+
+class FastEncoder:
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        keys = [str(c) for c in self.classes_.tolist()]
+        self._lookup = {k: i for i, k in enumerate(keys)}
+        self._index = pd.Index(keys)
+
+    @classmethod
+    def compile(cls, encoder):
+        # Terima LabelEncoder sklearn, VocabEncoder, FastEncoder, atau list kelas biasa
+        if isinstance(encoder, cls): return encoder
+        return cls(getattr(encoder, 'classes_', encoder))
+
+    def __len__(self):
+        return len(self.classes_)
+
+    def __contains__(self, value):
+        return str(value) in self._lookup
+
+    def encode(self, value, default=_MISSING):
+        idx = self._lookup.get(str(value), default)
+        if idx is _MISSING: raise KeyError(f"Label belum dikenal encoder: {value!r}")
+        return idx
+
+    def encode_many(self, values, default=-1):
+        # Vektor: array/Series/list -> array int64, label tak dikenal diisi `default`
+        keys = pd.Index(np.asarray(values).ravel()).astype(str)
+        idx = self._index.get_indexer(keys).astype(np.int64)
+        if default != -1: idx[idx < 0] = default
+        return idx
+
+    # --- Kompatibel dengan API LabelEncoder ---
+    def transform(self, values):
+        idx = self.encode_many(values)
+        if (idx < 0).any(): raise ValueError("y contains previously unseen labels")
+        return idx
+
+    def inverse_transform(self, idx):
+        return self.classes_[np.asarray(idx, dtype=np.int64)]
@@ -0,0 +1,380 @@
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+
+import numpy as np
+
+import model_registry
+from instrumentation import record
+
+# ==========================================
+# 🛰️ INFERENCE SERVER (SATU MODEL, MICRO-BATCH)
+# ==========================================
+# Tiap worker Streamlit load model sendiri lalu scoring satu pelanggan per panggilan: N kasir = N salinan
+# model, tanpa batching. Server ini memegang SATU scorer (model_registry.get_scorer, runtime keras/numpy
+# sama seperti app). Request dari semua kasir masuk antrian; thread batcher mengumpulkan request yang
+# datang dalam jendela WINDOW_MS (atau sampai MAX_BATCH_ROWS baris), scoring sekali, lalu memecah hasilnya
+# per request.
+#
+# Alamat: "unix:/path.sock" (atau path saja) untuk Unix socket, "host:port" untuk TCP localhost.
+# Kasir memakai InferenceClient kalau HOLYGRAIL_INFER_ADDR diisi; server mati/lambat -> scoring in-process.
+# Jalankan dari folder repo (artifact model dicari relatif):  python inference_server.py [--addr ...]
+
+INFER_ADDR = model_registry.INFER_ADDR      # kosong = kasir scoring in-process
+DEFAULT_ADDR = 'unix:/tmp/holygrail-infer.sock'
+WINDOW_MS = float(os.environ.get('HOLYGRAIL_INFER_WINDOW_MS', '2'))
+MAX_BATCH_ROWS = 8192
+CLIENT_TIMEOUT = float(os.environ.get('HOLYGRAIL_INFER_TIMEOUT', '0.5'))   # detik per request
+RETRY_SECONDS = 5.0         # setelah gagal, client langsung fallback selama ini sebelum coba server lagi
+
+# Frame: header <BI (op/status, panjang payload) + payload
+# OP_SCORE payload: n (uint32) + 5 array int32 panjang n (user, menu, cuaca, waktu, grup) -> float32 x n
+# OP_INFO  payload: kosong -> JSON (model_key, vocab, statistik batcher)
+OP_SCORE, OP_INFO = 1, 2
+STATUS_OK, STATUS_ERROR = 0, 1
+HEADER = struct.Struct('<BI')
+COUNT = struct.Struct('<I')
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def parse_address(addr):
+    # Return (family, alamat socket)
+    if addr.startswith('unix:'): return socket.AF_UNIX, addr[5:]
+    if addr.startswith('/') or addr.endswith('.sock'): return socket.AF_UNIX, addr
+    host, _, port = addr.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view, got = memoryview(buf), 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if k == 0: raise ConnectionError("koneksi ditutup")
+        got += k
+    return bytes(buf)
+
+
+def read_frame(sock):
+    code, length = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return code, _recv_exact(sock, length) if length else b''
+
+
+def write_frame(sock, code, payload=b''):
+    sock.sendall(HEADER.pack(code, len(payload)) + payload)
+
+
+def encode_score_request(user_idx, menu_idx, weather_idx, time_idx, group_idx):
+    # Argumen sama dengan NCFScorer.score (skalar/array, di-broadcast)
+    cols = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=np.int32)) for x in (user_idx, menu_idx, weather_idx, time_idx, group_idx)])
+    return COUNT.pack(len(cols[0])) + np.stack(cols).astype('<i4', copy=False).tobytes()
+
+
+def decode_score_request(payload):
+    (n,) = COUNT.unpack_from(payload)
+    if len(payload) != COUNT.size + 5 * 4 * n: raise ProtocolError("panjang payload score tidak cocok")
+    return np.frombuffer(payload, dtype='<i4', offset=COUNT.size).reshape(5, n)
+
+
+# ==========================================
+# 🧺 MICRO-BATCHER
+# ==========================================
+class _Pending:
+    __slots__ = ('cols', 'done', 'result', 'error', 'queued_at')
+
+    def __init__(self, cols):
+        self.cols = cols
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    def __init__(self, scorer, window_ms=WINDOW_MS, max_rows=MAX_BATCH_ROWS):
+        self.scorer = scorer
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_batch = 0
+        self.errors = 0
+        self.clients = 0            # koneksi aktif; tiap koneksi paling banyak punya satu request di antrian
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="infer-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread is not None: self._thread.join(timeout=5)
+
+    def client_connected(self, delta):
+        with self._lock: self.clients += delta
+
+    def submit(self, cols, timeout=None):
+        # cols: array int32 (5, n). Blok sampai batch yang memuat request ini selesai di-score
+        item = _Pending(cols)
+        self._queue.put(item)
+        if not item.done.wait(timeout): raise TimeoutError("batch scoring tidak selesai tepat waktu")
+        if item.error is not None: raise item.error
+        return item.result
+
+    def _collect(self, first):
+        batch, rows = [first], first.cols.shape[1]
+        deadline = time.perf_counter() + self.window
+        # Batch tidak mungkin lebih besar dari jumlah koneksi, jadi berhenti menunggu begitu semua sudah masuk
+        while rows < self.max_rows and len(batch) < self.clients:
+            try:
+                # Sisa antrian diambil tanpa menunggu; jendela waktu cuma dipakai kalau antrian kosong
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0: break
+                try: item = self._queue.get(timeout=remaining)
+                except queue.Empty: break
+            if item is None:
+                self._stop.set()
+                break
+            batch.append(item)
+            rows += item.cols.shape[1]
+        return batch, rows
+
+    def _run(self):
+        while not self._stop.is_set():
+            first = self._queue.get()
+            if first is None: break
+            batch, rows = self._collect(first)
+            t0 = time.perf_counter()
+            try:
+                cols = np.concatenate([p.cols for p in batch], axis=1) if len(batch) > 1 else batch[0].cols
+                scores = np.asarray(self.scorer.score(*cols), dtype=np.float32)
+                for p, part in zip(batch, np.split(scores, np.cumsum([p.cols.shape[1] for p in batch])[:-1])):
+                    p.result = part
+            except Exception as e:
+                with self._lock: self.errors += 1
+                for p in batch: p.error = e
+            ms = (time.perf_counter() - t0) * 1000
+            for p in batch: p.done.set()
+            with self._lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self.rows += rows
+                self.max_batch = max(self.max_batch, len(batch))
+            record("infer.batch", ms, requests=len(batch), rows=rows, wait_ms=round((t0 - first.queued_at) * 1000, 3))
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "batches": self.batches, "rows": self.rows, "errors": self.errors,
+                    "avg_batch": self.requests / self.batches if self.batches else 0.0, "max_batch": self.max_batch,
+                    "clients": self.clients, "queue": self._queue.qsize(), "window_ms": self.window * 1000}
+
+
+# ==========================================
+# 🖧 SERVER
+# ==========================================
+class _Handler(socketserver.BaseRequestHandler):
+    # Satu thread per koneksi kasir; koneksi dipakai ulang untuk banyak request
+    def setup(self):
+        self.server.batcher.client_connected(1)
+
+    def finish(self):
+        self.server.batcher.client_connected(-1)
+
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                op, payload = read_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if op == OP_SCORE:
+                    scores = server.batcher.submit(decode_score_request(payload), timeout=server.request_timeout)
+                    write_frame(self.request, STATUS_OK, scores.astype('<f4', copy=False).tobytes())
+                elif op == OP_INFO:
+                    write_frame(self.request, STATUS_OK, json.dumps(server.info()).encode('utf-8'))
+                else:
+                    raise ProtocolError(f"op tidak dikenal: {op}")
+            except (ConnectionError, BrokenPipeError):
+                return
+            except Exception as e:
+                try: write_frame(self.request, STATUS_ERROR, str(e).encode('utf-8'))
+                except OSError: return
+
+
+class _ServerMixin:
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128    # default socketserver 5: kasir yang connect bersamaan bisa ditolak
+
+    def info(self):
+        return {"model_key": self.model_key, "vocab": self.batcher.scorer.vocab_sizes, "pid": os.getpid(),
+                "uptime_s": time.monotonic() - self.started, **self.batcher.stats()}
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class UnixInferenceServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+else:
+    UnixInferenceServer = None   # Windows lama: pakai alamat host:port
+
+
+class TCPInferenceServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+def make_server(addr=DEFAULT_ADDR, scorer=None, window_ms=WINDOW_MS, max_rows=MAX_BATCH_ROWS, request_timeout=5.0):
+    # scorer default: satu instance dari model_registry (runtime mengikuti HOLYGRAIL_RUNTIME)
+    scorer = scorer or model_registry.get_scorer()
+    if scorer is None: raise RuntimeError("Model tidak bisa di-load, cek artifact di folder models/")
+    family, sock_addr = parse_address(addr)
+    if family == socket.AF_UNIX:
+        if UnixInferenceServer is None: raise RuntimeError("Unix socket tidak didukung di sistem ini, pakai --addr 127.0.0.1:PORT")
+        if os.path.exists(sock_addr): os.unlink(sock_addr)   # sisa server sebelumnya
+        server = UnixInferenceServer(sock_addr, _Handler)
+    else:
+        server = TCPInferenceServer(sock_addr, _Handler)
+    server.batcher = MicroBatcher(scorer, window_ms, max_rows).start()
+    server.request_timeout = request_timeout
+    server.model_key = model_registry.loaded_key() or model_registry.artifact_key()
+    server.started = time.monotonic()
+    return server
+
+
+# ==========================================
+# 📡 CLIENT (DIPAKAI KASIR)
+# ==========================================
+class InferenceClient:
+    # Pengganti NCFScorer di build_recommendations: score(...) dikirim ke server. Koneksi per thread (sesi
+    # Streamlit jalan di thread masing-masing). Server tidak bisa dihubungi, timeout, atau model beda versi
+    # -> fallback ke scorer in-process (di-load baru saat dibutuhkan) dan server dicoba lagi setelah RETRY_SECONDS.
+    def __init__(self, addr=None, timeout=CLIENT_TIMEOUT, retry_seconds=RETRY_SECONDS, fallback=model_registry.get_scorer):
+        self.addr = addr or INFER_ADDR or DEFAULT_ADDR
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.fallback = fallback
+        self.remote = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.last_error = None
+        self._down_until = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        family, sock_addr = parse_address(self.addr)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(sock_addr)
+            if family == socket.AF_INET: sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            info = self._call(sock, OP_INFO)
+            # Model di server harus versi yang sama dengan encoder yang SUDAH di-load kasir (bukan versi di disk
+            # sekarang: setelah retrain + restart server, encoder kasir masih versi lama), kalau tidak indeks meleset
+            if json.loads(info)['model_key'] != self.expected_key(): raise ProtocolError("model di server beda versi dengan encoder kasir")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def expected_key():
+        if model_registry.loaded_key() is None: model_registry.get_encoders()
+        return model_registry.loaded_key()
+
+    @staticmethod
+    def _call(sock, op, payload=b''):
+        write_frame(sock, op, payload)
+        status, body = read_frame(sock)
+        if status != STATUS_OK: raise ProtocolError(body.decode('utf-8', 'replace'))
+        return body
+
+    def _remote_score(self, payload):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None: sock = self._local.sock = self._connect()
+        try:
+            return np.frombuffer(self._call(sock, OP_SCORE, payload), dtype='<f4')
+        except Exception:
+            # Koneksi bisa setengah jalan (timeout di tengah frame), jangan dipakai lagi
+            self._local.sock = None
+            sock.close()
+            raise
+
+    def score(self, user_idx, menu_idx, weather_idx, time_idx, group_idx):
+        if time.monotonic() >= self._down_until:
+            try:
+                scores = self._remote_score(encode_score_request(user_idx, menu_idx, weather_idx, time_idx, group_idx))
+                with self._lock: self.remote += 1
+                return scores
+            except (OSError, ConnectionError, ProtocolError, ValueError, KeyError) as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self._down_until = time.monotonic() + self.retry_seconds
+        # Fallback lewat model_registry: scorer lokal menolak di-load kalau artifact di disk sudah beda versi
+        # dengan encoder yang dipakai (retrain setelah proses start) -> tidak ada skor sampai restart
+        scorer = self.fallback()
+        if scorer is None:
+            local_error = model_registry.load_report().get('scorer', {}).get('error')
+            raise RuntimeError(f"Inference server tidak tersedia ({self.last_error}) dan model lokal gagal di-load ({local_error})")
+        with self._lock: self.fallbacks += 1
+        return scorer.score(user_idx, menu_idx, weather_idx, time_idx, group_idx)
+
+    def server_info(self):
+        # Statistik server (None kalau tidak bisa dihubungi), koneksi terpisah supaya tidak ganggu thread sesi
+        family, sock_addr = parse_address(self.addr)
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(sock_addr)
+                return json.loads(self._call(sock, OP_INFO))
+        except (OSError, ConnectionError, ProtocolError, ValueError):
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {"addr": self.addr, "remote": self.remote, "fallbacks": self.fallbacks, "failures": self.failures,
+                    "last_error": self.last_error, "server_up": time.monotonic() >= self._down_until}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inference server rekomendasi (satu model, micro-batch)")
+    parser.add_argument('--addr', default=INFER_ADDR or DEFAULT_ADDR, help="unix:/path.sock atau host:port")
+    parser.add_argument('--window-ms', type=float, default=WINDOW_MS)
+    parser.add_argument('--max-batch-rows', type=int, default=MAX_BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.addr, window_ms=args.window_ms, max_rows=args.max_batch_rows)
+    print(f"🛰️ Inference server siap di {args.addr} · runtime {model_registry.get_runtime()} · jendela {args.window_ms} ms", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.batcher.stop()
+        server.server_close()
+        family, sock_addr = parse_address(args.addr)
+        if family == socket.AF_UNIX and os.path.exists(sock_addr): os.unlink(sock_addr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import atexit
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# ⏱️ INSTRUMENTASI (SPAN WAKTU PER BAGIAN)
+# ==========================================
+# Pakai:  with span("kasir.customer_search"): ...   atau   @timed("app.get_data_menu")
+# Durasi (ms) tiap span disimpan di ring buffer per nama -> p50/p95/p99 di tab admin "Performance".
+# Semua span juga masuk log terakhir (untuk export JSONL). Kalau HOLYGRAIL_SPANS_FILE diisi, span
+# ditulis append ke file itu per batch, jadi bisa dianalisis offline tanpa buka dashboard.
+# HOLYGRAIL_SPANS=0 mematikan semua pencatatan.
+
+ENABLED = os.environ.get('HOLYGRAIL_SPANS', '1') != '0'
+SPANS_FILE = os.environ.get('HOLYGRAIL_SPANS_FILE')
+MAX_SAMPLES = 2048          # per nama span
+MAX_LOG = 20000             # log global untuk export
+FLUSH_EVERY = 64
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_counts = defaultdict(int)
+_totals = defaultdict(float)
+_log = deque(maxlen=MAX_LOG)
+_pending = []
+
+
+def _flush_locked():
+    global _pending
+    if not _pending or not SPANS_FILE: return
+    os.makedirs(os.path.dirname(os.path.abspath(SPANS_FILE)), exist_ok=True)
+    with open(SPANS_FILE, 'a', encoding='utf-8') as f:
+        f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in _pending)
+    _pending = []
+
+
+def flush():
+    with _lock:
+        _flush_locked()
+
+
+atexit.register(flush)
+
+
+def record(name, ms, **attrs):
+    rec = {"ts": round(time.time(), 6), "span": name, "ms": round(ms, 4), **attrs}
+    with _lock:
+        _samples[name].append(ms)
+        _counts[name] += 1
+        _totals[name] += ms
+        _log.append(rec)
+        if SPANS_FILE:
+            _pending.append(rec)
+            if len(_pending) >= FLUSH_EVERY: _flush_locked()
+
+
+@contextmanager
+def span(name, **attrs):
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    err = None
+    try:
+        yield
+    except BaseException as e:
+        # Termasuk RerunException Streamlit (st.rerun di dalam span), dicatat apa adanya
+        err = type(e).__name__
+        raise
+    finally:
+        if err: attrs = {**attrs, "error": err}
+        record(name, (time.perf_counter() - t0) * 1000, **attrs)
+
+
+def timed(name):
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def summary():
+    # Satu baris per span: jumlah, p50/p95/p99/max (ms, dari sampel terakhir), total ms sepanjang proses
+    with _lock:
+        items = [(name, np.fromiter(s, dtype=float), _counts[name], _totals[name]) for name, s in _samples.items() if s]
+    rows = []
+    for name, arr, n, total in items:
+        p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+        rows.append({"span": name, "n": n, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": arr.max(), "total_ms": total})
+    cols = ["span", "n", "p50_ms", "p95_ms", "p99_ms", "max_ms", "total_ms"]
+    if not rows: return pd.DataFrame(columns=cols)
+    return pd.DataFrame(rows, columns=cols).sort_values("total_ms", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def to_jsonl():
+    with _lock:
+        log = list(_log)
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in log)
+
+
+def export_jsonl(path):
+    # Tulis log span yang masih di memori ke file (ditimpa, lewat file sementara biar tidak setengah jadi)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(to_jsonl())
+    os.replace(tmp, path)
+    return path
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _totals.clear()
+        _log.clear()
@@ -1,85 +1,44 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import tensorflow as tf
 import os  # <--- Saya tambah ini biar bisa cek file
 from datetime import datetime
-from sqlalchemy import text
+from checkout import save_checkout
+from checkout_journal import CheckoutJournal, new_idem_key
+from customer_search import CustomerNameIndex, SearchResultCache, normalize_name, search_customers
+from rec_cache import RecScoreCache, get_menu_version
+from rec_precompute import PrecomputedRecs
+from inference_server import InferenceClient
+from menu_retrieval import CANDIDATES, build_index
+import model_registry
+from menu_index import get_tags_for_menu, build_menu_index, category_order
+from ranking import boost_for_tags, boost_vector, guillotine_mask, make_context, top_k_by_mask
+from instrumentation import span, timed
 
 # ==========================================
 # 🧠 KONFIGURASI MODEL (AI 70 MENU)
 # ==========================================
-# FIX: Otomatis pilih jalur file (Cloud atau Laptop)
-if os.path.exists('ncf_model_sql.h5'):
-    MODEL_PATH = 'ncf_model_sql.h5'      # Jalur Cloud (GitHub)
-    ENCODER_PATH = 'encoders_sql.pkl'
-else:
-    MODEL_PATH = 'models/context_model.h5'       # Jalur Laptop
-    ENCODER_PATH = 'models/context_encoders.pkl'
+# Jalur file & load artifact ada di model_registry (satu salinan per proses, dipakai juga app_v4)
+MODEL_PATH, ENCODER_PATH = model_registry.MODEL_PATH, model_registry.ENCODER_PATH
+
+# Checkout: 'journal' (default, dicatat ke journal lokal lalu dikirim ke database di background) atau 'direct'
+CHECKOUT_MODE = os.environ.get('HOLYGRAIL_CHECKOUT', 'journal')
 
-@st.cache_resource
 def load_ai_brain():
-    try:
-        # Kita gunakan try-except agar tidak error fatal
-        if os.path.exists(MODEL_PATH):
-            model = tf.keras.models.load_model(MODEL_PATH, compile=False)
-        else:
-            model = None
-            
-        if os.path.exists(ENCODER_PATH):
-            with open(ENCODER_PATH, "rb") as f:
-                encoders = pickle.load(f)
-        else:
-            encoders = None
-            
-        return model, encoders
-    except Exception as e:
-        return None, None
+    # Runtime 'numpy' scoring dari bundle .npz, model Keras tidak perlu di-load (begitu juga kalau pakai inference server)
+    model = model_registry.get_model() if model_registry.get_runtime() == 'keras' and not model_registry.INFER_ADDR else None
+    return model, model_registry.get_encoders()
 
-# ==========================================
-# 🏷️ KNOWLEDGE BASE (TAGS)
-# ==========================================
-TAGS_DB = {
-    "paket": ["Sharing", "Rame", "Keluarga"],
-    "bucket": ["Sharing", "Rame", "Snack", "Keluarga"],
-    "platter": ["Sharing", "Rame", "Keluarga"],
-    "gurame": ["Sharing", "Berat", "Keluarga"],
-    "pizza": ["Sharing", "Rame", "Keluarga"],
-    "tumpeng": ["Sharing", "Rame", "Keluarga"],
-    "martabak": ["Sharing", "Snack"],
-    "sate kambing": ["Sharing", "Berat"],
-    "sop": ["Kuah", "Hangat"],
-    "soto": ["Kuah", "Hangat"],
-    "rawon": ["Kuah", "Hangat"],
-    "bakso": ["Kuah", "Hangat"],
-    "godog": ["Kuah", "Hangat"],
-    "seblak": ["Kuah", "Hangat", "Pedas"],
-    "ramen": ["Kuah", "Hangat"],
-    "sayur asem": ["Kuah", "Hangat"],
-    "capcay": ["Kuah", "Hangat"],
-    "es ": ["Dingin"],
-    "jus": ["Dingin"],
-    "soda": ["Dingin"],
-    "tea cold": ["Dingin"],
-    "milkshake": ["Dingin"],
-    "cola": ["Dingin"],
-    "sprite": ["Dingin"],
-    "air mineral": ["Dingin"],
-    "kopi": ["Hangat"],
-    "wedang": ["Hangat"],
-    "hot": ["Hangat"],
-    "tarik": ["Hangat"],
-    "tubruk": ["Hangat"],
-    "bandrek": ["Hangat"]
-}
-
-def get_tags_for_menu(menu_name):
-    tags = []
-    m_lower = str(menu_name).lower()
-    for keyword, t_list in TAGS_DB.items():
-        if keyword in m_lower: tags.extend(t_list)
-    return tags
+@st.cache_resource
+def get_inference_client():
+    # Satu client per proses (koneksi per thread sesi), fallback ke scorer lokal kalau server down/timeout
+    return InferenceClient(model_registry.INFER_ADDR)
+
+def get_scorer():
+    # Bobot diambil sekali per proses, skor dihitung NumPy (tanpa overhead model.predict).
+    # HOLYGRAIL_INFER_ADDR diisi -> skor dari inference_server.py (satu model + micro-batch untuk semua kasir)
+    if model_registry.INFER_ADDR: return get_inference_client()
+    return model_registry.get_scorer()
 
 def get_time_of_day():
     h = datetime.now().hour
@@ -88,44 +47,374 @@ def get_time_of_day():
     elif 15 <= h < 18: return "Siang"
     else: return "Malam"
 
-def get_menu_image(name, cat):
-    name = str(name).lower()
-    if "paket" in name or "platter" in name: return "https://cdn-icons-png.flaticon.com/512/3075/3075977.png"
-    if "soto" in name or "sop" in name or "ramen" in name: return "https://cdn-icons-png.flaticon.com/512/3480/3480765.png"
-    if "es " in name or "jus" in name or "cola" in name: return "https://cdn-icons-png.flaticon.com/512/2405/2405597.png"
-    if "kopi" in name or "hot" in name: return "https://cdn-icons-png.flaticon.com/512/924/924514.png"
-    if "burger" in name or "pizza" in name: return "https://cdn-icons-png.flaticon.com/512/3075/3075929.png"
-    return "https://cdn-icons-png.flaticon.com/512/1375/1375283.png"
-
 # ==========================================
 # 🚀 HYBRID BOOSTER LOGIC (Final Version)
 # ==========================================
+# Aturan boost ada di ranking.BOOST_RULES (Keluarga/Sharing +10, Hujan/Hangat +2, Cerah/Dingin +2)
 def apply_hybrid_boost(row, weather, group_size, time_now):
-    boost = 0.0
     tags = get_tags_for_menu(row['menu_name'])
-    
-    # Logic Keluarga (High Priority)
-    if group_size == "Keluarga":
-        if "Keluarga" in tags or "Sharing" in tags:
-            boost += 10.0 
-    
-    # Logic Cuaca
-    if weather == "Hujan" and "Hangat" in tags: boost += 2.0
-    if weather == "Cerah" and "Dingin" in tags: boost += 2.0
-        
-    return row['ai_score'] + boost
+    return row['ai_score'] + boost_for_tags(tags, make_context(weather, group_size, time_now))
+
+# ==========================================
+# 🎯 RANKING REKOMENDASI (DI-CACHE PER KONTEKS)
+# ==========================================
+@st.cache_resource
+def get_rec_cache():
+    # Satu cache per proses, dipakai bersama semua sesi kasir
+    return RecScoreCache(max_entries=512)
+
+@st.cache_resource
+def get_precomputed_recs():
+    # Top-N hasil job rec_precompute.py (memory map), versi baru dicek tiap 30 detik
+    return PrecomputedRecs(check_seconds=30)
+
+@st.cache_resource
+def get_search_cache():
+    # Cache hasil pencarian member (TTL pendek), dipakai bersama semua sesi kasir
+    return SearchResultCache(ttl_seconds=30)
+
+@st.cache_resource
+def get_name_index(_engine):
+    # Index nama member di memori, dimuat sekali per proses lalu di-sync inkremental
+    index = CustomerNameIndex(sync_seconds=60)
+    index.sync(_engine, force=True)
+    return index
+
+@st.cache_resource
+def get_checkout_journal(_engine):
+    # Satu journal + thread flusher per proses, dibuka app_v4 saat start (entri pending sisa restart langsung
+    # di-flush tanpa menunggu halaman kasir). Tidak butuh index nama / database untuk dibuka
+    return CheckoutJournal(_engine).start()
+
+@st.cache_resource
+def link_journal_name_index(_engine):
+    # Sekali per proses, dari halaman kasir: member baru masuk index nama setelah benar-benar tersimpan
+    index, search_cache = get_name_index(_engine), get_search_cache()
+    def on_new_user(uid, name):
+        index.add(uid, name)
+        search_cache.clear()
+    get_checkout_journal(_engine).on_new_user = on_new_user
+    return True
+
+@st.cache_resource(max_entries=2)
+def get_retrieval_index(menu_version, _scorer, _df_menu, _menu_idx):
+    # Index kandidat (menu_retrieval.py) per versi menu. None untuk katalog kecil -> scoring semua menu seperti biasa
+    return build_index(_scorer, _df_menu.join(_menu_idx))
+
+@st.cache_data(max_entries=4)
+def get_menu_index(df_menu):
+    # Tag & gambar dihitung sekali per isi menu, bukan per baris per rerun
+    return build_menu_index(df_menu)
+
+def build_recommendations(df_menu, scorer, encoders, cust_id, cust_status, weather, group_size, time_now, top_n=4, menu_idx=None):
+    if menu_idx is None: menu_idx = build_menu_index(df_menu)
+    rec_df = df_menu.join(menu_idx)
+    rec_df['ai_score'] = 0.0
+    scored_ok = False
+
+    # Filter Guillotine (Hujan -> tanpa Dingin, Sendiri -> tanpa Sharing), aturannya di ranking.GUILLOTINE_RULES
+    rec_df = rec_df[guillotine_mask(rec_df, make_context(weather, group_size, time_now))]
+
+    # AI Prediction
+    if not rec_df.empty:
+        try:
+            # Kunci encoder sudah dinormalisasi registry ('user_id' / 'menu_id')
+            u_key, m_key = 'user_id', 'menu_id'
+
+            with span("kasir.encode"):
+                ctx_weather_id = encoders['weather'].encode(weather)
+                ctx_time_id = encoders['time_of_day'].encode(time_now)
+                ctx_group_id = encoders['group_size'].encode(group_size)
+
+                u_id_enc = 0
+                if cust_status == "Lama":
+                    u_id_enc = encoders[u_key].encode(cust_id, default=0)
+
+                # Menu yang belum dikenal encoder dapat -1 dan tetap skor 0
+                if 'menu_enc' in rec_df: m_ids_enc = rec_df['menu_enc'].to_numpy()  # sudah dihitung katalog menu
+                else: m_ids_enc = encoders[m_key].encode_many(rec_df['menu_id'].to_numpy())
+                valid = m_ids_enc >= 0
+            
+            if valid.any():
+                ai_score = np.zeros(len(rec_df))
+                with span("kasir.model_score"):
+                    ai_score[valid] = scorer.score(u_id_enc, m_ids_enc[valid], ctx_weather_id, ctx_time_id, ctx_group_id)
+                rec_df['ai_score'] = ai_score
+            scored_ok = True
+        except Exception as e: pass 
+
+    # Hybrid Boost + Top-K per kategori (tanpa sort seluruh menu)
+    with span("kasir.hybrid_boost"):
+        final = rec_df['ai_score'].to_numpy() + boost_vector(rec_df, make_context(weather, group_size, time_now))
+        rec_df['final_score'] = final
+        is_drink = (rec_df['category'] == 'Minuman').to_numpy()
+
+        top_food = rec_df.iloc[top_k_by_mask(final, ~is_drink, top_n)]
+        top_drink = rec_df.iloc[top_k_by_mask(final, is_drink, top_n)]
+    return top_food, top_drink, scored_ok
+
+def retrieve_candidates(df_menu, retrieval, encoders, cust_id, cust_status, weather, group_size, time_now, k=CANDIDATES):
+    # Tahap 1: subset df_menu (maks k kandidat per kategori). Tahap 2 tetap build_recommendations di subset ini
+    u_id_enc = encoders['user_id'].encode(cust_id, default=0) if cust_status == "Lama" else 0
+    pos = retrieval.candidates(u_id_enc, encoders['weather'].encode(weather), encoders['time_of_day'].encode(time_now),
+                               encoders['group_size'].encode(group_size), make_context(weather, group_size, time_now), k)
+    return df_menu.iloc[pos]
+
+def precomputed_recommendations(df_menu, menu_idx, hit):
+    # hit dari PrecomputedRecs.lookup: posisi baris df_menu + final_score, untuk makanan & minuman
+    rows = df_menu.join(menu_idx)
+    (food_pos, food_score), (drink_pos, drink_score) = hit
+    return rows.iloc[food_pos].assign(final_score=food_score), rows.iloc[drink_pos].assign(final_score=drink_score)
+
+# ==========================================
+# 🧩 KARTU MENU & KERANJANG (FRAGMENT)
+# ==========================================
+# Hero rekomendasi, grid menu dan keranjang masing-masing st.fragment: interaksi di dalamnya cuma
+# menjalankan ulang bagian itu. Tambah item ke keranjang tetap rerun satu halaman (keranjang harus ikut
+# berubah), tapi rerun itu sekarang murah: HTML kartu & kunci pencarian dibuat sekali per versi menu.
+
+def add_to_cart(m_name, price, menu_id, category):
+    cart = st.session_state['cart']
+    if m_name in cart: cart[m_name]['qty'] += 1
+    else: cart[m_name] = {'qty': 1, 'price': price, 'id': menu_id, 'category': category}
+
+def rec_card_html(menu_name, img, raw):
+    if raw > 5.0: score_text, score_color = "🔥 Super Match", "#f472b6"
+    elif raw > 0.1: score_text, score_color = f"{int((raw/5.0)*100)}% Match", "#4ade80"
+    else: score_text, score_color = "New Item", "#94a3b8"
+    return f"""<div style="background:rgba(255,255,255,0.1); padding:10px; border-radius:10px; text-align:center;"><img src="{img}" style="width:50px; margin-bottom:5px;"><div style="font-size:11px; font-weight:bold; height:35px; display:flex; align-items:center; justify-content:center;">{menu_name}</div><div style="color:{score_color}; font-size:11px; font-weight:bold;">{score_text}</div></div>"""
+
+def menu_card_html(menu_name, price, img):
+    return f"""<div style="background:white; border:1px solid #ddd; border-radius:10px; text-align:center; overflow:hidden;"><img src="{img}" style="width:100%; height:100px; object-fit:cover;"><div style="padding:5px;"><div style="font-weight:bold; font-size:12px; color:#333; height:35px;">{menu_name}</div><div style="color:green; font-weight:bold;">Rp {price:,}</div></div></div>"""
+
+def build_menu_cards(df_menu, menu_idx):
+    # Satu baris per menu: field untuk tombol + HTML kartu jadi + kunci pencarian (huruf kecil, tanpa aksen)
+    cards = df_menu[['menu_id', 'menu_name', 'price', 'category']].copy()
+    cards['cat_order'] = menu_idx['cat_order']
+    cards['html'] = [menu_card_html(n, p, img) for n, p, img in zip(cards['menu_name'], cards['price'], menu_idx['img_url'])]
+    cards['search_key'] = [normalize_name(n) for n in cards['menu_name']]
+    return cards
+
+@st.cache_data(max_entries=4)
+def get_menu_cards(menu_version, _df_menu, _menu_idx):
+    # Key cache cuma versi menu (sidik jari isi), frame tidak perlu di-hash tiap rerun
+    return build_menu_cards(_df_menu, _menu_idx)
+
+def search_menu_cards(cards, search):
+    # Mask baris yang cocok, dihitung sekali untuk semua tab
+    q = normalize_name(search).strip() if search else ""
+    if not q: return np.ones(len(cards), dtype=bool)
+    return np.fromiter((q in key for key in cards['search_key']), dtype=bool, count=len(cards))
+
+@st.fragment
+@timed("kasir.menu_grid")
+def render_menu_grid(df_menu, menu_idx, menu_version):
+    # Fragment: ketik di "Cari menu..." cuma menjalankan ulang grid ini, bukan seluruh halaman
+    cards = get_menu_cards(menu_version, df_menu, menu_idx)
+    st.subheader(f"📖 Buku Menu ({len(df_menu)} Item)") 
+    search = st.text_input("Cari menu...", label_visibility="collapsed")
+    visible = search_menu_cards(cards, search)
+    cats = category_order(df_menu['category'])
+    tabs = st.tabs(cats)
+    for i, cat in enumerate(cats):
+        with tabs[i]:
+            sel = cards[visible & (cards['cat_order'].to_numpy() == i)]
+            cols = st.columns(3)
+            for idx, (m_id, m_name, price, category, html) in enumerate(zip(sel['menu_id'], sel['menu_name'], sel['price'], sel['category'], sel['html'])):
+                with cols[idx % 3]:
+                    st.markdown(html, unsafe_allow_html=True)
+                    if st.button("➕", key=f"add_{m_id}", use_container_width=True):
+                        add_to_cart(m_name, price, m_id, category)
+                        st.rerun()
+
+@st.fragment
+@timed("kasir.recommendations")
+def render_recommendations(df_menu, menu_idx, menu_version, scorer, encoders, cust_id, cust_status, weather, group_size, time_now):
+    # Cache LRU: rerun untuk pelanggan + konteks yang sama tidak perlu predict ulang
+    rec_cache = get_rec_cache()
+    user_key = str(cust_id) if cust_status == "Lama" else None
+    cache_key = rec_cache.make_key(user_key, weather, time_now, group_size, menu_version)
+    cached = rec_cache.get(cache_key)
+    # Member yang sudah di-precompute (rec_precompute.py) cukup lookup; pelanggan baru / store basi pakai model live
+    hit = None
+    if cached is None and user_key is not None and menu_idx is not None:
+        with span("kasir.rec_lookup"):
+            hit = get_precomputed_recs().lookup(cust_id, weather, time_now, group_size, menu_version)
+    if hit is not None:
+        top_food, top_drink = precomputed_recommendations(df_menu, menu_idx, hit)
+        rec_cache.put(cache_key, (top_food, top_drink))
+    elif cached is None:
+        # Katalog besar: model cuma men-score kandidat dari index embedding menu (dua tahap)
+        frame = df_menu
+        retrieval = get_retrieval_index(menu_version, scorer, df_menu, menu_idx) if menu_idx is not None and 'menu_enc' in menu_idx else None
+        if retrieval is not None:
+            try:
+                with span("kasir.retrieval"):
+                    frame = retrieve_candidates(df_menu, retrieval, encoders, cust_id, cust_status, weather, group_size, time_now)
+            except Exception: frame = df_menu
+        top_food, top_drink, scored_ok = build_recommendations(frame, scorer, encoders, cust_id, cust_status, weather, group_size, time_now, menu_idx=menu_idx)
+        # Hasil gagal predict (skor 0 semua) jangan disimpan, biar rerun berikutnya coba lagi
+        if scored_ok: rec_cache.put(cache_key, (top_food, top_drink))
+    else:
+        top_food, top_drink = cached
+
+    # Display Cards
+    st.markdown('<div class="hero-container">', unsafe_allow_html=True)
+    st.markdown(f"""<div style="font-size:18px; font-weight:bold; color:#fbbf24;">✨ Rekomendasi Cerdas</div>""", unsafe_allow_html=True)
+
+    def render_cards(df, key_prefix):
+        if df.empty: return
+        cols = st.columns(4)
+        for idx, row in enumerate(df.itertuples(index=False)):
+            with cols[idx]:
+                st.markdown(rec_card_html(row.menu_name, row.img_url, row.final_score), unsafe_allow_html=True)
+                if st.button("AMBIL", key=f"{key_prefix}_{idx}", use_container_width=True):
+                    add_to_cart(row.menu_name, row.price, row.menu_id, row.category)
+                    st.toast(f"+ {row.menu_name}")
+                    st.rerun()
+
+    st.markdown('<div class="rec-title">🍽️ TOP MAKANAN</div>', unsafe_allow_html=True)
+    render_cards(top_food, "food")
+    st.markdown('<div class="rec-title">🥤 TOP MINUMAN</div>', unsafe_allow_html=True)
+    render_cards(top_drink, "drink")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+@timed("kasir.cart")
+def render_cart(engine, search_name, cust_id, final_cust_name, weather, group_size, time_now):
+    # Fragment: hapus item, ganti metode bayar & ketik uang diterima cuma menjalankan ulang keranjang
+    st.markdown('<div class="bill-box">', unsafe_allow_html=True)
+    st.markdown('<h4>🛒 Keranjang Belanja</h4>', unsafe_allow_html=True)
+
+    if not st.session_state['cart']:
+        st.caption("Keranjang masih kosong.")
+    else:
+        total_belanja = 0
+        # List Item
+        for m, item in st.session_state['cart'].items():
+            subtotal = item['qty'] * item['price']
+            total_belanja += subtotal
+
+            c1, c2, c3 = st.columns([3, 1, 1])
+            c1.write(f"**{m}**\n<small>@{item['price']:,}</small>", unsafe_allow_html=True)
+            c2.write(f"x{item['qty']}")
+            if c3.button("🗑️", key=f"del_{m}"): 
+                del st.session_state['cart'][m]
+                st.rerun(scope="fragment")
+
+        st.markdown("---")
+        st.markdown(f"### Total: Rp {total_belanja:,}")
+
+        # --- PEMBAYARAN ---
+        st.write("💳 **Metode Pembayaran**")
+        metode = st.selectbox("Pilih", ["Tunai", "QRIS", "Debit/Credit"], label_visibility="collapsed")
+
+        bayar = 0
+        kembalian = 0
+        siap_bayar = False
+
+        if metode == "Tunai":
+            bayar = st.number_input("Uang Diterima (Rp)", min_value=0, value=total_belanja)
+            kembalian = bayar - total_belanja
+            if bayar >= total_belanja:
+                st.success(f"Kembalian: Rp {kembalian:,}")
+                siap_bayar = True
+            else:
+                st.error("Uang kurang!")
+        else:
+            st.info("Silakan scan QRIS / Gesek Kartu")
+            siap_bayar = True
+            bayar = total_belanja # Anggap pas
+
+        # --- TOMBOL BAYAR ---
+        if siap_bayar:
+            if st.button("✅ PROSES PEMBAYARAN", type="primary", use_container_width=True):
+                if not search_name:
+                    st.error("Harap isi nama pelanggan!")
+                else:
+                    try:
+                        ts_val = datetime.now()
+                        if CHECKOUT_MODE == 'journal':
+                            # 1+2. Catat ke journal lokal (milidetik), flusher yang menulis User + Orders ke database.
+                            # Kunci idempotensi dipakai ulang kalau pencatatan gagal lalu tombol diklik lagi
+                            idem_key = st.session_state.setdefault('checkout_key', new_idem_key())
+                            # engine bisa None (database putus): journal sudah dibuka app_v4 saat start, _engine tidak ikut
+                            # key cache_resource jadi yang dikembalikan tetap journal proses ini
+                            with span("kasir.checkout"):
+                                get_checkout_journal(engine).append(cust_id, final_cust_name, st.session_state['cart'], weather, group_size, time_now, ts=ts_val, idem_key=idem_key)
+                        else:
+                            # 1+2. Simpan User (kalau baru) + semua Orders dalam SATU transaksi (qty ikut tersimpan)
+                            with span("kasir.checkout"):
+                                uid_final, _ = save_checkout(engine, cust_id, final_cust_name, st.session_state['cart'], weather, group_size, time_now, ts=ts_val)
+                            if not cust_id:
+                                # Member baru harus langsung bisa dicari di rerun berikutnya
+                                get_name_index(engine).add(uid_final, final_cust_name)
+                                get_search_cache().clear()
+                        st.session_state.pop('checkout_key', None)
+
+                        # 3. TAMPILKAN STRUK (Session State Trick)
+                        st.session_state['last_trx'] = {
+                            'name': final_cust_name,
+                            'items': st.session_state['cart'],
+                            'total': total_belanja,
+                            'pay': bayar,
+                            'change': kembalian,
+                            'method': metode,
+                            'time': ts_val.strftime("%Y-%m-%d %H:%M")
+                        }
+                        st.session_state['cart'] = {} # Kosongkan keranjang
+                        st.rerun()
+
+                    except Exception as e:
+                        st.error(f"Error Database: {e}")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # --- STRUK POP-UP (SETELAH BAYAR) ---
+    if 'last_trx' in st.session_state and st.session_state['last_trx']:
+        trx = st.session_state['last_trx']
+        st.markdown("---")
+        with st.expander("🧾 LIHAT STRUK TERAKHIR", expanded=True):
+            st.markdown(f"""
+            <div style="text-align:center; font-family:monospace;">
+                <h4>HOLY GRAIL RESTO</h4>
+                <p>{trx['time']}</p>
+                <p>Pelanggan: {trx['name']}</p>
+                <hr>
+            </div>
+            """, unsafe_allow_html=True)
+
+            for m, item in trx['items'].items():
+                sub = item['qty'] * item['price']
+                st.markdown(f"<div style='display:flex; justify-content:space-between; font-family:monospace;'><span>{item['qty']}x {m}</span><span>{sub:,}</span></div>", unsafe_allow_html=True)
+
+            st.markdown(f"""
+            <div style="font-family:monospace;">
+                <hr>
+                <div style="display:flex; justify-content:space-between;"><b>TOTAL</b> <b>Rp {trx['total']:,}</b></div>
+                <div style="display:flex; justify-content:space-between;">Bayar ({trx['method']}) <span>{trx['pay']:,}</span></div>
+                <div style="display:flex; justify-content:space-between;">Kembali <span>{trx['change']:,}</span></div>
+                <hr>
+                <center>Terima Kasih!</center>
+            </div>
+            """, unsafe_allow_html=True)
+
+            if st.button("Transaksi Baru"):
+                del st.session_state['last_trx']
+                st.rerun(scope="fragment")
 
 # ==========================================
 # 🖥️ UI KASIR (LENGKAP: BAYAR + STRUK)
 # ==========================================
-def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_ignored, navigate_to, get_logo_svg):
+def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_ignored, navigate_to, get_logo_svg, menu_idx=None, menu_version=None):
     
-    # KITA PAKAI MODEL DARI MAIN.PY JIKA ADA, KALAU TIDAK LOAD SENDIRI
+    # Model, encoder & scorer semuanya dari model_registry (satu salinan per proses, sama dengan App Utama)
     model_local, encoders = load_ai_brain()
-    
-    # Prioritas: Pakai model yang dikirim dari App Utama (biar hemat memori)
-    # Tapi kalau App Utama gagal load, pakai model_local yang barusan kita load
-    model_ai = model_ignored if model_ignored is not None else model_local
+    scorer = get_scorer()
+    # Kolom turunan & versi menu biasanya sudah disiapkan katalog menu (menu_catalog.py)
+    if menu_idx is None: menu_idx = get_menu_index(df_menu)
+    if menu_version is None: menu_version = get_menu_version(df_menu)
+    if CHECKOUT_MODE == 'journal' and engine is not None: link_journal_name_index(engine)
 
     # CSS Styles
     st.markdown("""
@@ -147,10 +436,7 @@ def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_i
         # Debug AI Brain Status
         with st.expander("🔍 System Status"):
             if encoders:
-                # FIX: Cek kunci dictionary biar tidak error (user_id vs user_encoder)
-                u_key = 'user_id' if 'user_id' in encoders else 'user_encoder'
-                m_key = 'menu_id' if 'menu_id' in encoders else 'item_encoder'
-                
+                m_key = 'menu_id'
                 st.write(f"🧠 AI Menu Memory: {len(encoders[m_key].classes_)}")
                 st.write(f"📚 DB Menu Count: {len(df_menu)}")
                 if len(encoders[m_key].classes_) != len(df_menu):
@@ -160,6 +446,30 @@ def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_i
             else:
                 st.error("AI Offline")
 
+            # Waktu load & memori artifact (dari model_registry)
+            rep = model_registry.load_report()
+            for name in ('model', 'bundle', 'encoders', 'scorer'):
+                if name in rep: st.caption(f"⏱️ {name}: {rep[name]['seconds']:.2f} s · +{rep[name]['rss_delta_mb']:.0f} MB RSS")
+            st.caption(f"💾 RSS proses: {rep['_process']['rss_mb']:.0f} MB · ⚙️ runtime: {rep['_process']['runtime']}")
+            try:
+                ns = get_name_index(engine).stats()
+                st.caption(f"👤 Index member: {ns['users']} nama · hit {ns['hits']} / miss {ns['misses']}")
+            except Exception: pass
+            if model_registry.INFER_ADDR:
+                ic = get_inference_client().stats()
+                st.caption(f"🛰️ Inference server: {'online' if ic['server_up'] else 'offline'} · remote {ic['remote']} · fallback {ic['fallbacks']}")
+                if ic['last_error'] and not ic['server_up']: st.warning(f"⚠️ Inference server: {ic['last_error']}")
+            ri = get_retrieval_index(menu_version, scorer, df_menu, menu_idx) if scorer is not None and 'menu_enc' in menu_idx else None
+            if ri is not None:
+                rs = ri.stats()
+                st.caption(f"🧭 Retrieval kandidat: {rs['mode']} · {rs['menu']} menu · rata-rata {rs['avg_candidates']:.0f} kandidat")
+            ps = get_precomputed_recs().stats()
+            st.caption(f"🗃️ Rekomendasi precompute: {ps['users']} user · versi {ps['version'] or '-'} · hit {ps['hits']} / miss {ps['misses']}")
+            if CHECKOUT_MODE == 'journal':
+                jm = get_checkout_journal(engine).metrics()
+                st.caption(f"📮 Journal checkout: antre {jm['depth']} · lag {jm['oldest_pending_s']:.1f} s · retry {jm['retries']}")
+                if jm['dead'] or (jm['depth'] and jm['last_error']): st.warning(f"⚠️ Journal: {jm['dead']} entri gagal · {jm['last_error'] or '-'}")
+
         if st.button("🏠 Keluar", use_container_width=True): navigate_to('landing')
 
     st.markdown("""<div class='marquee-box'>📢 SYSTEM READY: Pembayaran Tunai & QRIS Aktif. Struk Otomatis. 🧾</div>""", unsafe_allow_html=True)
@@ -181,8 +491,14 @@ def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_i
     cust_id, cust_status, final_cust_name = None, "Baru", search_name
     if search_name:
         try:
-            with engine.connect() as conn:
-                found_users = conn.execute(text("SELECT user_id, name FROM users WHERE name ILIKE :nm LIMIT 5"), {"nm": f"%{search_name}%"}).fetchall()
+            with span("kasir.customer_search"):
+                name_index = get_name_index(engine)
+                name_index.sync(engine)
+                found_users = name_index.search(search_name)
+                if not found_users:
+                    # Miss: bisa jadi member baru dari kasir lain yang belum ke-sync, cek database
+                    found_users = search_customers(engine, search_name, cache=get_search_cache())
+                    for uid, nm in found_users: name_index.add(uid, nm)
             if found_users:
                 options = {f"{u[1]} (ID:{u[0]})": u for u in found_users}
                 new_opt = f"➕ Baru: '{search_name}'"
@@ -199,75 +515,8 @@ def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_i
     # ==========================================
     # 🔥 AI RECOMMENDATION ENGINE
     # ==========================================
-    if search_name and model_ai and encoders:
-        rec_df = df_menu.copy()
-        rec_df['ai_score'] = 0.0
-
-        # Filter Guillotine
-        if weather == "Hujan":
-            rec_df = rec_df[~rec_df['menu_name'].apply(lambda x: "Dingin" in get_tags_for_menu(x))]
-        if group_size == "Sendiri":
-            rec_df = rec_df[~rec_df['menu_name'].apply(lambda x: "Sharing" in get_tags_for_menu(x))]
-        
-        # AI Prediction
-        if not rec_df.empty:
-            try:
-                # --- FIX: DETEKSI KUNCI ENCODER (Biar gak error KeyError) ---
-                u_key = 'user_id' if 'user_id' in encoders else 'user_encoder'
-                m_key = 'menu_id' if 'menu_id' in encoders else 'item_encoder'
-
-                ctx_weather_id = encoders['weather'].transform([weather])[0]
-                ctx_time_id = encoders['time_of_day'].transform([time_now])[0] 
-                ctx_group_id = encoders['group_size'].transform([group_size])[0]
-                
-                u_id_enc = 0
-                if cust_status == "Lama" and str(cust_id) in encoders[u_key].classes_:
-                    u_id_enc = encoders[u_key].transform([str(cust_id)])[0]
-                
-                rec_df['menu_id_str'] = rec_df['menu_id'].astype(str)
-                valid_menus = rec_df[rec_df['menu_id_str'].isin(encoders[m_key].classes_)]
-                
-                if not valid_menus.empty:
-                    m_ids_enc = encoders[m_key].transform(valid_menus['menu_id_str'].values)
-                    count = len(m_ids_enc)
-                    scores = model_ai.predict(
-                        [np.array([u_id_enc]*count), np.array(m_ids_enc), np.array([ctx_weather_id]*count), 
-                         np.array([ctx_time_id]*count), np.array([ctx_group_id]*count)], verbose=0
-                    ).flatten()
-                    rec_df.loc[valid_menus.index, 'ai_score'] = scores
-            except Exception as e: pass 
-
-        # Hybrid Boost
-        rec_df['final_score'] = rec_df.apply(lambda row: apply_hybrid_boost(row, weather, group_size, time_now), axis=1)
-        rec_df = rec_df.sort_values('final_score', ascending=False)
-
-        # Display Cards
-        st.markdown('<div class="hero-container">', unsafe_allow_html=True)
-        st.markdown(f"""<div style="font-size:18px; font-weight:bold; color:#fbbf24;">✨ Rekomendasi Cerdas</div>""", unsafe_allow_html=True)
-        
-        def render_cards(df, key_prefix):
-            if df.empty: return
-            cols = st.columns(4)
-            for idx, (_, row) in enumerate(df.iterrows()):
-                with cols[idx]:
-                    img = get_menu_image(row['menu_name'], row['category'])
-                    raw = row['final_score']
-                    if raw > 5.0: score_text, score_color = "🔥 Super Match", "#f472b6"
-                    elif raw > 0.1: score_text, score_color = f"{int((raw/5.0)*100)}% Match", "#4ade80"
-                    else: score_text, score_color = "New Item", "#94a3b8"
-
-                    st.markdown(f"""<div style="background:rgba(255,255,255,0.1); padding:10px; border-radius:10px; text-align:center;"><img src="{img}" style="width:50px; margin-bottom:5px;"><div style="font-size:11px; font-weight:bold; height:35px; display:flex; align-items:center; justify-content:center;">{row['menu_name']}</div><div style="color:{score_color}; font-size:11px; font-weight:bold;">{score_text}</div></div>""", unsafe_allow_html=True)
-                    if st.button("AMBIL", key=f"{key_prefix}_{idx}", use_container_width=True):
-                        m_name = row['menu_name']
-                        if m_name in st.session_state['cart']: st.session_state['cart'][m_name]['qty'] += 1
-                        else: st.session_state['cart'][m_name] = {'qty': 1, 'price': row['price'], 'id': row['menu_id'], 'category': row['category']}
-                        st.toast(f"+ {m_name}")
-
-        st.markdown('<div class="rec-title">🍽️ TOP MAKANAN</div>', unsafe_allow_html=True)
-        render_cards(rec_df[rec_df['category'] != 'Minuman'].head(4), "food")
-        st.markdown('<div class="rec-title">🥤 TOP MINUMAN</div>', unsafe_allow_html=True)
-        render_cards(rec_df[rec_df['category'] == 'Minuman'].head(4), "drink")
-        st.markdown('</div>', unsafe_allow_html=True)
+    if search_name and scorer and encoders:
+        render_recommendations(df_menu, menu_idx, menu_version, scorer, encoders, cust_id, cust_status, weather, group_size, time_now)
 
     # ==========================================
     # 🛒 MENU & CART (DENGAN PEMBAYARAN & STRUK)
@@ -275,145 +524,8 @@ def show_kasir_page(engine, df_menu, model_ignored, user_enc_ignored, item_enc_i
     col_menu, col_bill = st.columns([2.5, 1.5]) 
     
     with col_menu:
-        st.subheader(f"📖 Buku Menu ({len(df_menu)} Item)") 
-        search = st.text_input("Cari menu...", label_visibility="collapsed")
-        cats = sorted(df_menu['category'].unique().tolist())
-        if "Paket Jumbo" in cats: cats.remove("Paket Jumbo"); cats.insert(0, "Paket Jumbo")
-        tabs = st.tabs(cats)
-        for i, cat in enumerate(cats):
-            with tabs[i]:
-                filtered = df_menu[df_menu['category'] == cat]
-                if search: filtered = filtered[filtered['menu_name'].str.contains(search, case=False)]
-                cols = st.columns(3)
-                for idx, (_, row) in enumerate(filtered.iterrows()):
-                    with cols[idx % 3]:
-                        img = get_menu_image(row['menu_name'], cat)
-                        st.markdown(f"""<div style="background:white; border:1px solid #ddd; border-radius:10px; text-align:center; overflow:hidden;"><img src="{img}" style="width:100%; height:100px; object-fit:cover;"><div style="padding:5px;"><div style="font-weight:bold; font-size:12px; color:#333; height:35px;">{row['menu_name']}</div><div style="color:green; font-weight:bold;">Rp {row['price']:,}</div></div></div>""", unsafe_allow_html=True)
-                        if st.button("➕", key=f"add_{row['menu_id']}", use_container_width=True):
-                            m_name = row['menu_name']
-                            if m_name in st.session_state['cart']: st.session_state['cart'][m_name]['qty'] += 1
-                            else: st.session_state['cart'][m_name] = {'qty': 1, 'price': row['price'], 'id': row['menu_id'], 'category': row['category']}
-                            st.rerun()
+        render_menu_grid(df_menu, menu_idx, menu_version)
 
     # --- KERANJANG & CHECKOUT ---
     with col_bill:
-        st.markdown('<div class="bill-box">', unsafe_allow_html=True)
-        st.markdown('<h4>🛒 Keranjang Belanja</h4>', unsafe_allow_html=True)
-        
-        if not st.session_state['cart']:
-            st.caption("Keranjang masih kosong.")
-        else:
-            total_belanja = 0
-            # List Item
-            for m, item in st.session_state['cart'].items():
-                subtotal = item['qty'] * item['price']
-                total_belanja += subtotal
-                
-                c1, c2, c3 = st.columns([3, 1, 1])
-                c1.write(f"**{m}**\n<small>@{item['price']:,}</small>", unsafe_allow_html=True)
-                c2.write(f"x{item['qty']}")
-                if c3.button("🗑️", key=f"del_{m}"): 
-                    del st.session_state['cart'][m]
-                    st.rerun()
-            
-            st.markdown("---")
-            st.markdown(f"### Total: Rp {total_belanja:,}")
-            
-            # --- PEMBAYARAN ---
-            st.write("💳 **Metode Pembayaran**")
-            metode = st.selectbox("Pilih", ["Tunai", "QRIS", "Debit/Credit"], label_visibility="collapsed")
-            
-            bayar = 0
-            kembalian = 0
-            siap_bayar = False
-
-            if metode == "Tunai":
-                bayar = st.number_input("Uang Diterima (Rp)", min_value=0, value=total_belanja)
-                kembalian = bayar - total_belanja
-                if bayar >= total_belanja:
-                    st.success(f"Kembalian: Rp {kembalian:,}")
-                    siap_bayar = True
-                else:
-                    st.error("Uang kurang!")
-            else:
-                st.info("Silakan scan QRIS / Gesek Kartu")
-                siap_bayar = True
-                bayar = total_belanja # Anggap pas
-
-            # --- TOMBOL BAYAR ---
-            if siap_bayar:
-                if st.button("✅ PROSES PEMBAYARAN", type="primary", use_container_width=True):
-                    if not search_name:
-                        st.error("Harap isi nama pelanggan!")
-                    else:
-                        try:
-                            # 1. Simpan User (Kalau baru)
-                            uid_final = cust_id
-                            if not uid_final:
-                                with engine.connect() as conn:
-                                    res = conn.execute(text("INSERT INTO users (name, favorite_category) VALUES (:nm, 'Umum') RETURNING user_id"), {"nm": final_cust_name})
-                                    uid_final = res.fetchone()[0]
-                                    conn.commit()
-                            
-                            # 2. Simpan Transaksi (Orders)
-                            ts_val = datetime.now()
-                            with engine.connect() as conn:
-                                for m, item in st.session_state['cart'].items():
-                                    conn.execute(text("""
-                                        INSERT INTO orders (user_id, menu_id, rating, weather, group_size, time_of_day, timestamp) 
-                                        VALUES (:u, :m, 5, :w, :g, :t, :ts)
-                                    """), {
-                                        "u": uid_final, "m": item['id'], "w": weather, "g": group_size, "t": time_now, "ts": ts_val
-                                    })
-                                conn.commit()
-                            
-                            # 3. TAMPILKAN STRUK (Session State Trick)
-                            st.session_state['last_trx'] = {
-                                'name': final_cust_name,
-                                'items': st.session_state['cart'],
-                                'total': total_belanja,
-                                'pay': bayar,
-                                'change': kembalian,
-                                'method': metode,
-                                'time': ts_val.strftime("%Y-%m-%d %H:%M")
-                            }
-                            st.session_state['cart'] = {} # Kosongkan keranjang
-                            st.rerun()
-
-                        except Exception as e:
-                            st.error(f"Error Database: {e}")
-
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # --- STRUK POP-UP (SETELAH BAYAR) ---
-        if 'last_trx' in st.session_state and st.session_state['last_trx']:
-            trx = st.session_state['last_trx']
-            st.markdown("---")
-            with st.expander("🧾 LIHAT STRUK TERAKHIR", expanded=True):
-                st.markdown(f"""
-                <div style="text-align:center; font-family:monospace;">
-                    <h4>HOLY GRAIL RESTO</h4>
-                    <p>{trx['time']}</p>
-                    <p>Pelanggan: {trx['name']}</p>
-                    <hr>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                for m, item in trx['items'].items():
-                    sub = item['qty'] * item['price']
-                    st.markdown(f"<div style='display:flex; justify-content:space-between; font-family:monospace;'><span>{item['qty']}x {m}</span><span>{sub:,}</span></div>", unsafe_allow_html=True)
-                
-                st.markdown(f"""
-                <div style="font-family:monospace;">
-                    <hr>
-                    <div style="display:flex; justify-content:space-between;"><b>TOTAL</b> <b>Rp {trx['total']:,}</b></div>
-                    <div style="display:flex; justify-content:space-between;">Bayar ({trx['method']}) <span>{trx['pay']:,}</span></div>
-                    <div style="display:flex; justify-content:space-between;">Kembali <span>{trx['change']:,}</span></div>
-                    <hr>
-                    <center>Terima Kasih!</center>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                if st.button("Transaksi Baru"):
-                    del st.session_state['last_trx']
-                    st.rerun()
+        render_cart(engine, search_name, cust_id, final_cust_name, weather, group_size, time_now)
@@ -0,0 +1,104 @@
+import time
+import threading
+
+import pandas as pd
+from sqlalchemy import text
+
+from menu_index import build_menu_index
+from rec_cache import get_menu_version
+
+# ==========================================
+# 📖 KATALOG MENU (CACHE + DETEKSI PERUBAHAN)
+# ==========================================
+# Dulu tiap rerun kasir (tiap klik ➕) SELECT * FROM menu. Sekarang menu dimuat sekali; tiap rerun
+# paling banyak satu query versi kecil (dibatasi check_seconds), dan SELECT * cuma jalan lagi kalau
+# versinya berubah. Kolom turunan (tag, img_url, cat_order, menu_enc) ikut dihitung saat reload.
+#
+# Versi: COUNT(*) + MAX(menu_id) + MAX(updated_at) (kolom & trigger dari sql/migrations/002_menu_updated_at.sql).
+# Kalau kolom updated_at belum ada, pakai sidik jari isi tabel (jumlah harga & panjang nama/kategori).
+# Database tidak bisa dihubungi: snapshot terakhir tetap dipakai (kasir + journal checkout jalan terus).
+
+MENU_QUERY = "SELECT * FROM menu"
+
+VERSION_QUERIES = [
+    "SELECT COUNT(*), MAX(menu_id), MAX(updated_at) FROM menu",
+    "SELECT COUNT(*), MAX(menu_id), SUM(price), SUM(LENGTH(menu_name)), SUM(LENGTH(category)) FROM menu",
+]
+
+
+class MenuCatalog:
+    def __init__(self, engine, check_seconds=5, menu_encoder=None):
+        # menu_encoder: callable -> FastEncoder menu_id (atau None). Dipanggil saat cek versi,
+        # jadi kalau encoder model diganti, kolom menu_enc ikut dihitung ulang
+        self.engine = engine
+        self.check_seconds = check_seconds
+        self.menu_encoder = menu_encoder
+        self.version = get_menu_version(None)
+        self.reloads = 0
+        self.checks = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_check = 0.0
+        self._stamp = None
+        self._encoder = None
+        self._version_query = None
+        self._menu = pd.DataFrame()
+        self._index = build_menu_index(self._menu)
+        self._index_reload = 0
+        self._lock = threading.Lock()
+
+    def _read_stamp(self):
+        queries = [self._version_query] if self._version_query else VERSION_QUERIES
+        for q in queries:
+            try:
+                with self.engine.connect() as conn:
+                    stamp = tuple(conn.execute(text(q)).one())
+                self._version_query = q
+                return stamp
+            except Exception:
+                continue
+        return None
+
+    def _current_encoder(self):
+        if self.menu_encoder is None: return None
+        try:
+            return self.menu_encoder()
+        except Exception:
+            return None
+
+    def refresh(self, force=False):
+        # Return (df_menu, menu_idx, version) dari snapshot yang konsisten satu sama lain.
+        # version = sidik jari isi menu (sama dengan rec_cache.get_menu_version), dipakai di key cache rekomendasi
+        with self._lock:
+            if force or time.monotonic() - self.last_check >= self.check_seconds:
+                self.checks += 1
+                stamp = self._read_stamp()
+                encoder = self._current_encoder()
+                # Versi tidak terbaca (database putus) + snapshot sudah ada -> tetap pakai snapshot
+                if force or self.reloads == 0 or (stamp is not None and stamp != self._stamp):
+                    try:
+                        self._menu = pd.read_sql(MENU_QUERY, self.engine)
+                        self._stamp = stamp
+                        self.version = get_menu_version(self._menu)
+                        self.reloads += 1
+                        self.last_error = None
+                    except Exception as e:
+                        self.errors += 1
+                        self.last_error = f"{type(e).__name__}: {e}"
+                        print(f"⚠️ Katalog menu gagal reload, pakai snapshot terakhir: {self.last_error}")
+                if encoder is not self._encoder or self.reloads != self._index_reload:
+                    self._index = build_menu_index(self._menu, menu_encoder=encoder)
+                    self._encoder = encoder
+                    self._index_reload = self.reloads
+                # Belum pernah berhasil load: coba lagi di panggilan berikutnya, jangan tunggu check_seconds
+                self.last_check = time.monotonic() if self.reloads else 0.0
+            return self._menu, self._index, self.version
+
+    def invalidate(self):
+        with self._lock:
+            self.last_check = 0.0
+            self._stamp = None
+
+    def stats(self):
+        return {"version": self.version, "reloads": self.reloads, "checks": self.checks, "rows": len(self._menu),
+                "errors": self.errors, "last_error": self.last_error}
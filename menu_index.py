@@ -0,0 +1,120 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 🏷️ KNOWLEDGE BASE (TAGS)
+# ==========================================
+TAGS_DB = {
+    "paket": ["Sharing", "Rame", "Keluarga"],
+    "bucket": ["Sharing", "Rame", "Snack", "Keluarga"],
+    "platter": ["Sharing", "Rame", "Keluarga"],
+    "gurame": ["Sharing", "Berat", "Keluarga"],
+    "pizza": ["Sharing", "Rame", "Keluarga"],
+    "tumpeng": ["Sharing", "Rame", "Keluarga"],
+    "martabak": ["Sharing", "Snack"],
+    "sate kambing": ["Sharing", "Berat"],
+    "sop": ["Kuah", "Hangat"],
+    "soto": ["Kuah", "Hangat"],
+    "rawon": ["Kuah", "Hangat"],
+    "bakso": ["Kuah", "Hangat"],
+    "godog": ["Kuah", "Hangat"],
+    "seblak": ["Kuah", "Hangat", "Pedas"],
+    "ramen": ["Kuah", "Hangat"],
+    "sayur asem": ["Kuah", "Hangat"],
+    "capcay": ["Kuah", "Hangat"],
+    "es ": ["Dingin"],
+    "jus": ["Dingin"],
+    "soda": ["Dingin"],
+    "tea cold": ["Dingin"],
+    "milkshake": ["Dingin"],
+    "cola": ["Dingin"],
+    "sprite": ["Dingin"],
+    "air mineral": ["Dingin"],
+    "kopi": ["Hangat"],
+    "wedang": ["Hangat"],
+    "hot": ["Hangat"],
+    "tarik": ["Hangat"],
+    "tubruk": ["Hangat"],
+    "bandrek": ["Hangat"]
+}
+
+# Aturan gambar kartu menu (dicek berurutan, yang pertama cocok menang)
+IMAGE_RULES = [
+    (["paket", "platter"], "https://cdn-icons-png.flaticon.com/512/3075/3075977.png"),
+    (["soto", "sop", "ramen"], "https://cdn-icons-png.flaticon.com/512/3480/3480765.png"),
+    (["es ", "jus", "cola"], "https://cdn-icons-png.flaticon.com/512/2405/2405597.png"),
+    (["kopi", "hot"], "https://cdn-icons-png.flaticon.com/512/924/924514.png"),
+    (["burger", "pizza"], "https://cdn-icons-png.flaticon.com/512/3075/3075929.png"),
+]
+DEFAULT_IMAGE = "https://cdn-icons-png.flaticon.com/512/1375/1375283.png"
+PINNED_CATEGORIES = ["Paket Jumbo"]
+
+ALL_TAGS = sorted({t for t_list in TAGS_DB.values() for t in t_list})
+KEYWORDS = list(TAGS_DB.keys())
+
+# ==========================================
+# ⚙️ INDEX TAG (SEKALI PER LOAD MENU)
+# ==========================================
+# Satu regex untuk semua keyword. Lookahead (?=(...)) bikin findall mencoba di SETIAP posisi,
+# jadi keyword yang tumpang tindih tetap ketemu (sama seperti `keyword in nama`).
+# Keyword panjang dicoba duluan; keyword lain yang merupakan substring-nya ikut dihitung lewat _KW_CLOSURE.
+_KW_PATTERN = re.compile("(?=(" + "|".join(re.escape(k) for k in sorted(KEYWORDS, key=len, reverse=True)) + "))")
+_KW_POS = {k: i for i, k in enumerate(KEYWORDS)}
+_KW_CLOSURE = np.array([[k2 in k1 for k2 in KEYWORDS] for k1 in KEYWORDS])
+_KW_TAGS = np.array([[t in TAGS_DB[k] for t in ALL_TAGS] for k in KEYWORDS])
+_MATCH_TAGS = _KW_CLOSURE.astype(np.int32) @ _KW_TAGS.astype(np.int32) > 0
+
+def tag_col(tag):
+    return f"tag_{tag}"
+
+def get_tags_for_menu(menu_name):
+    tags = []
+    m_lower = str(menu_name).lower()
+    for keyword, t_list in TAGS_DB.items():
+        if keyword in m_lower: tags.extend(t_list)
+    return tags
+
+def get_menu_image(name, cat):
+    name = str(name).lower()
+    for keywords, url in IMAGE_RULES:
+        if any(k in name for k in keywords): return url
+    return DEFAULT_IMAGE
+
+def build_tag_matrix(menu_names):
+    # Hasil: array bool (n_menu, len(ALL_TAGS))
+    lower = pd.Series(menu_names).astype(str).str.lower().reset_index(drop=True)
+    out = np.zeros((len(lower), len(ALL_TAGS)), dtype=bool)
+    hits = lower.str.findall(_KW_PATTERN).explode().dropna()
+    if not hits.empty:
+        rows = hits.index.to_numpy()
+        kw_ids = hits.map(_KW_POS).to_numpy(dtype=np.int64)
+        np.logical_or.at(out, rows, _MATCH_TAGS[kw_ids])
+    return out
+
+def build_image_urls(menu_names):
+    lower = pd.Series(menu_names).astype(str).str.lower()
+    conds = [lower.str.contains("|".join(re.escape(k) for k in kws), regex=True).to_numpy() for kws, _ in IMAGE_RULES]
+    return np.select(conds, [url for _, url in IMAGE_RULES], default=DEFAULT_IMAGE)
+
+def category_order(categories):
+    # Urutan tab kategori di kasir: abjad, tapi kategori unggulan (PINNED_CATEGORIES) paling depan
+    cats = sorted(set(categories))
+    pinned = [c for c in PINNED_CATEGORIES if c in cats]
+    return pinned + [c for c in cats if c not in pinned]
+
+def build_menu_index(df_menu, menu_encoder=None):
+    # Kolom turunan per menu: tag_<Tag> (bool) + img_url + cat_order (posisi tab kategori)
+    # + menu_enc (index encoder model, -1 kalau menu belum dikenal; hanya kalau encoder diberikan).
+    # Index sama dengan df_menu biar bisa di-join
+    names = df_menu['menu_name'] if 'menu_name' in df_menu else pd.Series([], dtype=str)
+    tags = build_tag_matrix(names)
+    idx = pd.DataFrame(tags, index=df_menu.index, columns=[tag_col(t) for t in ALL_TAGS])
+    idx['img_url'] = build_image_urls(names) if len(names) else pd.Series([], dtype=str)
+    if 'category' in df_menu:
+        order = {c: i for i, c in enumerate(category_order(df_menu['category']))}
+        idx['cat_order'] = df_menu['category'].map(order).astype(np.int64)
+    if menu_encoder is not None and 'menu_id' in df_menu:
+        idx['menu_enc'] = menu_encoder.encode_many(df_menu['menu_id'].to_numpy())
+    return idx
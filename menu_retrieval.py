@@ -0,0 +1,179 @@
+import os
+import threading
+
+import numpy as np
+
+from ranking import BOOST_RULES, GUILLOTINE_RULES, boost_vector, guillotine_mask, top_k_indices
+from menu_index import tag_col
+from scoring_engine import ACTIVATIONS
+
+# ==========================================
+# 🧭 RETRIEVAL KANDIDAT (DUA TAHAP)
+# ==========================================
+# build_recommendations men-score SEMUA baris menu lalu ambil top-k: oke untuk 70 menu, berat untuk katalog
+# ribuan SKU. Di sini tahap 1 memilih beberapa ratus kandidat per kategori (makanan / minuman) lewat
+# dot product, tahap 2 (build_recommendations biasa: filter + model + hybrid boost) cuma untuk kandidat.
+#
+# Vektor item = proyeksi embedding menu ke Dense pertama (NCFScorer.proj[1] = E_menu @ W1_blok_menu).
+# Vektor query = gradien kepala MLP terhadap input Dense pertama, di titik user + konteks + rata-rata item,
+# jadi skor_model(menu) ~ c0 + q . P_menu (linearisasi orde satu model yang sama, bukan model kedua).
+# Boost & filter guillotine cuma bergantung pada tag, jadi item dikelompokkan per (kategori, tanda tag):
+# di dalam satu kelompok boost & filter konstan dan urutan murni dot product.
+#
+# Mode: 'exact' (matmul NumPy + argpartition) atau 'ivf' (k-means per kelompok, probe IVF_NPROBE centroid
+# terdekat, perkiraan). HOLYGRAIL_RETRIEVAL=off mematikan; 'auto' = exact kalau menu >= RETRIEVAL_MIN_MENU.
+# Default 2000 = crossover terukur (benchmarks/bench_retrieval.py): di 1000 menu dua tahap masih lebih lambat
+# (4.29 ms vs 3.55 ms scoring penuh), overhead tahap 1 baru tertutup di ~1500-2000 menu; diambil batas atasnya.
+
+RETRIEVAL_MODE = os.environ.get('HOLYGRAIL_RETRIEVAL', 'auto')
+RETRIEVAL_MIN_MENU = int(os.environ.get('HOLYGRAIL_RETRIEVAL_MIN_MENU', '2000'))
+CANDIDATES = int(os.environ.get('HOLYGRAIL_RETRIEVAL_K', '200'))     # per kategori (makanan & minuman)
+IVF_NPROBE = int(os.environ.get('HOLYGRAIL_RETRIEVAL_NPROBE', '16'))     # lebih besar = recall naik, lebih lambat
+KMEANS_ITERS = 15
+
+ACTIVATION_GRADS = {
+    "relu": lambda z, a: (z > 0).astype(z.dtype),
+    "linear": lambda z, a: np.ones_like(z),
+    "sigmoid": lambda z, a: a * (1.0 - a),
+    "tanh": lambda z, a: 1.0 - a * a,
+}
+_ACT_NAMES = {id(fn): name for name, fn in ACTIVATIONS.items()}
+
+# Tag yang menentukan boost / filter (tanda kelompok item)
+SIGNATURE_TAGS = [tuple(r["any_tags"]) for r in BOOST_RULES] + [(r["drop_tag"],) for r in GUILLOTINE_RULES]
+
+
+def retrieval_mode(n_menu, mode=RETRIEVAL_MODE, min_menu=RETRIEVAL_MIN_MENU):
+    # Mode efektif untuk katalog sebesar n_menu (None = scoring penuh seperti biasa)
+    if mode == 'off': return None
+    if mode == 'auto': return 'exact' if n_menu >= min_menu else None
+    return mode
+
+
+def linearize(scorer, h0):
+    # (f(h0), df/dh0) untuk kepala MLP NCFScorer: act1 -> Dense... -> skor (backprop manual)
+    a = scorer.act1(h0)
+    cache = [(h0, a, scorer.act1, None)]
+    for w, b, act in scorer.rest:
+        z = a @ w + b
+        a = act(z)
+        cache.append((z, a, act, w))
+    grad = np.ones(1, dtype=h0.dtype)
+    for z, out, act, w in reversed(cache):
+        grad = grad * ACTIVATION_GRADS[_ACT_NAMES[id(act)]](z, out)
+        if w is not None: grad = grad @ w.T
+    return float(a[0]), grad
+
+
+def _kmeans(x, k, iters=KMEANS_ITERS, seed=0):
+    # Lloyd sederhana (L2), cukup untuk kuantiser kasar IVF. Return (centroid, label per baris)
+    rng = np.random.default_rng(seed)
+    centers = x[rng.choice(len(x), k, replace=False)].copy()
+    x_sq = (x * x).sum(axis=1)
+    for _ in range(iters):
+        dist = x_sq[:, None] - 2.0 * x @ centers.T + (centers * centers).sum(axis=1)[None, :]
+        labels = dist.argmin(axis=1)
+        for c in range(k):
+            members = labels == c
+            if members.any(): centers[c] = x[members].mean(axis=0)
+    return centers, labels
+
+
+class _Group:
+    # Satu kelompok item dengan kategori + tanda tag yang sama
+    def __init__(self, positions, vectors, known, sample_row, mode, nprobe, seed):
+        self.positions = positions          # posisi baris di menu_frame
+        self.vectors = vectors              # P_menu item yang dikenal encoder
+        self.known = known                  # False = menu baru (belum ada di encoder, skor model 0)
+        self.sample_row = sample_row        # satu baris tag untuk hitung boost/filter kelompok
+        self.lists = None
+        if mode == 'ivf' and len(vectors) > 4 * nprobe:
+            nlist = max(nprobe, int(np.sqrt(len(vectors))))
+            self.centers, labels = _kmeans(vectors, nlist, seed=seed)
+            self.lists = [np.flatnonzero(labels == c) for c in range(nlist)]
+            self.nprobe = nprobe
+
+    def top(self, q, c0, k):
+        # Return (posisi menu, skor tahap 1 tanpa boost) untuk k item terbaik di kelompok ini
+        pos_known = self.positions[self.known]
+        if self.lists is not None:
+            probe = top_k_indices(self.centers @ q, self.nprobe)
+            rows = np.concatenate([self.lists[c] for c in probe])
+        else:
+            rows = np.arange(len(pos_known))
+        scores = c0 + self.vectors[rows] @ q
+        best = top_k_indices(scores, k)
+        pos, sc = pos_known[rows[best]], scores[best]
+        unknown = self.positions[~self.known][:k]
+        if len(unknown): pos, sc = np.concatenate([pos, unknown]), np.concatenate([sc, np.zeros(len(unknown))])
+        return pos, sc
+
+
+class MenuRetrievalIndex:
+    def __init__(self, scorer, menu_frame, mode='exact', nprobe=IVF_NPROBE, seed=0):
+        # menu_frame: df_menu.join(menu_idx) (kolom menu_enc, category, tag_*), urutan baris = posisi hasil
+        self.scorer = scorer
+        self.mode = mode
+        self.n_menu = len(menu_frame)
+        self.queries = 0
+        self.candidates_total = 0
+        self._lock = threading.Lock()
+
+        enc = menu_frame['menu_enc'].to_numpy()
+        proj = scorer.proj[1]
+        known = (enc >= 0) & (enc < len(proj))
+        self.mean_item = proj[enc[known]].mean(axis=0) if known.any() else np.zeros(proj.shape[1], dtype=proj.dtype)
+
+        is_drink = (menu_frame['category'] == 'Minuman').to_numpy()
+        signature = [is_drink]
+        for tags in SIGNATURE_TAGS:
+            hit = np.zeros(len(menu_frame), dtype=bool)
+            for t in tags:
+                col = tag_col(t)
+                if col in menu_frame: hit |= menu_frame[col].to_numpy(dtype=bool)
+            signature.append(hit)
+        keys = np.stack(signature, axis=1)
+        self.groups = {}
+        for g, key in enumerate(np.unique(keys, axis=0)):
+            pos = np.flatnonzero((keys == key).all(axis=1))
+            k = known[pos]
+            self.groups[tuple(key.tolist())] = _Group(pos, proj[enc[pos[k]]], k, menu_frame.iloc[pos[:1]], mode, nprobe, seed + g)
+
+    def query(self, user_enc, weather_enc, time_enc, group_enc):
+        # (c0, q): skor_model(menu) ~ c0 + q . P_menu
+        s = self.scorer
+        h0 = s.b1 + s.proj[0][user_enc] + s.proj[2][weather_enc] + s.proj[3][time_enc] + s.proj[4][group_enc] + self.mean_item
+        f0, q = linearize(s, h0)
+        return f0 - float(q @ self.mean_item), q
+
+    def candidates(self, user_enc, weather_enc, time_enc, group_enc, context, k=CANDIDATES):
+        # Posisi baris menu_frame (terurut) untuk maksimal k kandidat per kategori
+        c0, q = self.query(user_enc, weather_enc, time_enc, group_enc)
+        per_cat = {False: ([], []), True: ([], [])}
+        for key, grp in self.groups.items():
+            if not guillotine_mask(grp.sample_row, context)[0]: continue
+            pos, sc = grp.top(q, c0, k)
+            per_cat[key[0]][0].append(pos)
+            per_cat[key[0]][1].append(sc + boost_vector(grp.sample_row, context)[0])
+        out = []
+        for pos, sc in per_cat.values():
+            if not pos: continue
+            pos, sc = np.concatenate(pos), np.concatenate(sc)
+            out.append(pos[top_k_indices(sc, k)])
+        result = np.sort(np.concatenate(out)) if out else np.empty(0, dtype=np.int64)
+        with self._lock:
+            self.queries += 1
+            self.candidates_total += len(result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"mode": self.mode, "menu": self.n_menu, "groups": len(self.groups), "queries": self.queries,
+                    "avg_candidates": self.candidates_total / self.queries if self.queries else 0.0}
+
+
+def build_index(scorer, menu_frame, mode=None):
+    # None kalau katalog kecil / retrieval dimatikan / scorer bukan NCFScorer lokal (mis. client inference server)
+    mode = mode or retrieval_mode(len(menu_frame))
+    if mode is None or not hasattr(scorer, 'proj'): return None
+    return MenuRetrievalIndex(scorer, menu_frame, mode=mode)
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import argparse
+
+import numpy as np
+
+from scoring_engine import NCFScorer, INPUT_ORDER, extract_ncf_weights
+
+# ==========================================
+# 🎒 BUNDLE INFERENSI RINGAN (.npz + JSON)
+# ==========================================
+# Model NCF cuma butuh embedding + bobot Dense. Bundle ini berisi bobot itu (.npz) dan vocab
+# encoder (JSON), jadi pod kasir bisa scoring tanpa import TensorFlow maupun sklearn.
+#
+# Export: python model_bundle.py [--model models/context_model.h5] [--encoders models/context_encoders.pkl]
+
+BUNDLE_FORMAT = 1
+BUNDLE_PATH = 'models/context_bundle.npz'
+VOCAB_PATH = 'models/context_vocab.json'
+
+
+class VocabEncoder:
+    # Pengganti ringan sklearn LabelEncoder (classes_ terurut, transform, inverse_transform)
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def transform(self, values):
+        values = np.asarray(values)
+        if len(self.classes_) == 0 or values.size == 0:
+            if values.size: raise ValueError("y contains previously unseen labels")
+            return np.empty(values.shape, dtype=np.int64)
+        idx = np.clip(np.searchsorted(self.classes_, values), 0, len(self.classes_) - 1)
+        if not np.all(self.classes_[idx] == values):
+            raise ValueError("y contains previously unseen labels")
+        return idx.astype(np.int64)
+
+    def inverse_transform(self, idx):
+        return self.classes_[np.asarray(idx, dtype=np.int64)]
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''): h.update(chunk)
+    return h.hexdigest()
+
+
+def export_bundle(model, encoders, bundle_path=BUNDLE_PATH, vocab_path=VOCAB_PATH, source_path=None):
+    w = extract_ncf_weights(model)
+    arrays = {f"emb_{i}": e for i, e in enumerate(w['embeddings'])}
+    for i, (kernel, bias, _) in enumerate(w['dense']):
+        arrays[f"dense_w_{i}"] = kernel
+        arrays[f"dense_b_{i}"] = bias
+
+    meta = {
+        'format': BUNDLE_FORMAT,
+        'input_order': INPUT_ORDER,
+        'concat_order': w['concat_order'],
+        'activations': [act for _, _, act in w['dense']],
+        'source_sha256': file_sha256(source_path) if source_path else None,
+        'vocab': {k: np.asarray(enc.classes_).tolist() for k, enc in encoders.items()},
+    }
+
+    # Tulis ke file sementara lalu rename, biar pembaca tidak pernah lihat bundle setengah jadi
+    tmp_npz = bundle_path + '.tmp.npz'
+    np.savez(tmp_npz, **arrays)
+    with open(vocab_path + '.tmp', 'w') as f: json.dump(meta, f)
+    os.replace(tmp_npz, bundle_path)
+    os.replace(vocab_path + '.tmp', vocab_path)
+    return meta
+
+
+def load_meta(vocab_path=VOCAB_PATH):
+    with open(vocab_path) as f:
+        return json.load(f)
+
+
+def load_bundle(bundle_path=BUNDLE_PATH, vocab_path=VOCAB_PATH):
+    meta = load_meta(vocab_path)
+    if meta.get('format') != BUNDLE_FORMAT: raise ValueError(f"Format bundle tidak dikenal: {meta.get('format')}")
+    with np.load(bundle_path) as data:
+        embeddings = [data[f"emb_{i}"] for i in range(len(meta['input_order']))]
+        dense = [(data[f"dense_w_{i}"], data[f"dense_b_{i}"], act) for i, act in enumerate(meta['activations'])]
+    scorer = NCFScorer(embeddings, meta['concat_order'], dense)
+    encoders = {k: VocabEncoder(v) for k, v in meta['vocab'].items()}
+    return scorer, encoders, meta
+
+
+def bundle_matches(model_path, bundle_path=BUNDLE_PATH, vocab_path=VOCAB_PATH):
+    # Bundle dipakai kalau ada DAN dibuat dari file .h5 yang sekarang (kalau .h5 ikut dikirim)
+    if not (os.path.exists(bundle_path) and os.path.exists(vocab_path)): return False
+    if not os.path.exists(model_path): return True
+    try:
+        return load_meta(vocab_path).get('source_sha256') == file_sha256(model_path)
+    except (OSError, ValueError):
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export context_model.h5 + encoder ke bundle .npz/.json")
+    parser.add_argument('--model', default='models/context_model.h5')
+    parser.add_argument('--encoders', default='models/context_encoders.pkl')
+    parser.add_argument('--bundle', default=BUNDLE_PATH)
+    parser.add_argument('--vocab', default=VOCAB_PATH)
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+    model = tf.keras.models.load_model(args.model, compile=False)
+    with open(args.encoders, 'rb') as f:
+        encoders = pickle.load(f)
+    meta = export_bundle(model, encoders, args.bundle, args.vocab, source_path=args.model)
+    size_kb = (os.path.getsize(args.bundle) + os.path.getsize(args.vocab)) / 1024
+    print(f"✅ Bundle ditulis: {args.bundle} + {args.vocab} ({size_kb:.0f} KB, vocab: {', '.join(meta['vocab'])})")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import os
+import time
+import pickle
+import warnings
+import threading
+from types import MappingProxyType
+
+import model_bundle
+from fast_encoder import FastEncoder
+
+# ==========================================
+# 📦 MODEL REGISTRY (SATU LOAD PER PROSES)
+# ==========================================
+# Dulu app_v4.get_resources dan kasir_view.load_ai_brain masing-masing load model + encoder
+# (dua graph TF per worker). Sekarang semua lewat sini: tiap artifact di-load SEKALI per proses.
+# TensorFlow baru di-import di dalam get_model(), jadi modul ini aman di-import dari halaman mana pun.
+
+# FIX: Otomatis pilih jalur file (Cloud atau Laptop)
+if os.path.exists('ncf_model_sql.h5'):
+    MODEL_PATH = 'ncf_model_sql.h5'      # Jalur Cloud (GitHub)
+    ENCODER_PATH = 'encoders_sql.pkl'
+else:
+    MODEL_PATH = 'models/context_model.h5'       # Jalur Laptop
+    ENCODER_PATH = 'models/context_encoders.pkl'
+
+# Backend scoring: 'keras' (model .h5 + TF), 'numpy' (bundle .npz tanpa TF), 'auto' (bundle kalau cocok dengan .h5)
+RUNTIME = os.environ.get('HOLYGRAIL_RUNTIME', 'auto')
+BUNDLE_PATH, VOCAB_PATH = model_bundle.BUNDLE_PATH, model_bundle.VOCAB_PATH
+KMEANS_PATH = 'models/kmeans_model.pkl'     # {'model': KMeans, 'scaler': StandardScaler}, dipakai segmentation.py
+
+# Alamat inference_server.py. Kalau diisi, proses Streamlit cukup load encoder; model dipegang server
+# (scorer lokal baru di-load kalau server tidak bisa dihubungi)
+INFER_ADDR = os.environ.get('HOLYGRAIL_INFER_ADDR', '')
+
+# Nama kunci encoder beda versi: 'user_id' vs 'user_encoder', 'menu_id' vs 'item_encoder'
+ENCODER_ALIASES = {
+    'user_id': ['user_id', 'user_encoder'],
+    'menu_id': ['menu_id', 'item_encoder'],
+}
+
+_lock = threading.RLock()
+_artifacts = {}
+_report = {}
+_warmup_thread = None
+_runtime = None
+_pinned_key = None
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'): return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return 0.0
+
+
+def _load_once(name, path, loader):
+    with _lock:
+        if name in _artifacts: return _artifacts[name]
+        rss_before, t0 = _rss_mb(), time.perf_counter()
+        obj, error = None, None
+        try:
+            if path is None or os.path.exists(path): obj = loader()
+            else: error = f"File tidak ditemukan: {path}"
+        except Exception as e:
+            error = str(e)
+        _report[name] = {
+            'path': path,
+            'seconds': time.perf_counter() - t0,
+            'rss_delta_mb': _rss_mb() - rss_before,
+            'file_mb': os.path.getsize(path) / 2**20 if path and os.path.exists(path) else 0.0,
+            'error': error,
+        }
+        if error: print(f"⚠️ Registry gagal load {name}: {error}")
+        _artifacts[name] = obj
+        return obj
+
+
+def normalize_encoders(data):
+    # Semua encoder dikompilasi jadi FastEncoder (lookup dict/hash, tanpa sklearn di hot path)
+    if not data: return None
+    enc = {k: FastEncoder.compile(v) for k, v in data.items()}
+    for canon, aliases in ENCODER_ALIASES.items():
+        for k in aliases:
+            if k in data:
+                enc[canon] = enc[k]
+                break
+    return MappingProxyType(enc)
+
+
+def get_runtime():
+    global _runtime
+    with _lock:
+        if _runtime is None:
+            if RUNTIME in ('keras', 'numpy'): _runtime = RUNTIME
+            else: _runtime = 'numpy' if model_bundle.bundle_matches(MODEL_PATH, BUNDLE_PATH, VOCAB_PATH) else 'keras'
+        return _runtime
+
+
+def artifact_key():
+    # Identitas artifact model + encoder di disk SEKARANG (runtime + path + ukuran + mtime), murah dicek
+    runtime = get_runtime()
+    paths = (BUNDLE_PATH, VOCAB_PATH) if runtime == 'numpy' else (MODEL_PATH, ENCODER_PATH)
+    parts = [runtime]
+    for p in paths:
+        try:
+            st = os.stat(p)
+            parts.append(f"{p}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{p}:-")
+    return "|".join(parts)
+
+
+def loaded_key():
+    # artifact_key() saat model/encoder pertama kali di-load proses ini (None kalau belum ada yang di-load)
+    with _lock:
+        return _pinned_key
+
+
+def _pin():
+    # Semua artifact di satu proses harus dari versi yang sama. Retrain bisa promote versi baru ke disk
+    # setelah encoder di-load; scorer yang di-load belakangan dari versi baru akan salah baca indeks encoder lama
+    global _pinned_key
+    key = artifact_key()
+    with _lock:
+        if _pinned_key is None: _pinned_key = key
+        elif key != _pinned_key: raise RuntimeError("Artifact model di disk berganti sejak proses ini load encoder/model, restart proses")
+
+
+def artifacts_available():
+    if get_runtime() == 'numpy': return os.path.exists(BUNDLE_PATH) and os.path.exists(VOCAB_PATH)
+    return os.path.exists(MODEL_PATH) and os.path.exists(ENCODER_PATH)
+
+
+def get_model(path=MODEL_PATH):
+    def load():
+        _pin()
+        import tensorflow as tf
+        return tf.keras.models.load_model(path, compile=False)
+    return _load_once('model', path, load)
+
+
+def get_bundle():
+    # (scorer, encoders, meta) dari bundle ringan, tanpa TF & sklearn
+    def load():
+        _pin()
+        return model_bundle.load_bundle(BUNDLE_PATH, VOCAB_PATH)
+    return _load_once('bundle', BUNDLE_PATH, load)
+
+
+def get_encoders(path=ENCODER_PATH):
+    if get_runtime() == 'numpy':
+        def load_vocab():
+            bundle = get_bundle()
+            return normalize_encoders(bundle[1]) if bundle else None
+        return _load_once('encoders', VOCAB_PATH, load_vocab)
+
+    def load():
+        _pin()
+        with open(path, 'rb') as f:
+            return normalize_encoders(pickle.load(f))
+    return _load_once('encoders', path, load)
+
+
+def get_scorer():
+    def load():
+        _pin()
+        if get_runtime() == 'numpy':
+            bundle = get_bundle()
+            if bundle is None: return None
+            scorer = bundle[0]
+        else:
+            from scoring_engine import NCFScorer
+            model = get_model()
+            if model is None: return None
+            scorer = NCFScorer.from_keras(model)
+        for arr in scorer.embeddings + scorer.proj: arr.setflags(write=False)
+        return scorer
+    return _load_once('scorer', None, load)
+
+
+def get_kmeans(path=KMEANS_PATH):
+    # Model segmentasi pelanggan. Pickle sklearn versi lama masih jalan, warning versinya tidak perlu dicetak
+    def load():
+        with open(path, 'rb') as f, warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return pickle.load(f)
+    return _load_once('kmeans', path, load)
+
+
+def warm_up_async():
+    # Load model + encoder + scorer di background thread (idempotent, cukup sekali per proses)
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def _warm_up():
+    get_encoders()
+    if INFER_ADDR: return
+    if get_runtime() == 'keras': get_model()
+    get_scorer()
+
+
+def is_loaded(name='model'):
+    with _lock:
+        return name in _artifacts
+
+
+def load_report():
+    # Waktu load & jejak memori per artifact (buat sizing container)
+    with _lock:
+        rep = {k: dict(v) for k, v in _report.items()}
+    rep['_process'] = {'rss_mb': _rss_mb(), 'runtime': get_runtime()}
+    return rep
+
+
+def clear():
+    global _runtime, _pinned_key
+    with _lock:
+        _artifacts.clear()
+        _report.clear()
+        _runtime = None
+        _pinned_key = None
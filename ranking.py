@@ -0,0 +1,71 @@
+import numpy as np
+
+from menu_index import tag_col
+
+# ==========================================
+# 🚀 HYBRID BOOSTER RULES (DEKLARATIF)
+# ==========================================
+# Tiap aturan: kalau konteks cocok DAN menu punya salah satu tag -> skor + boost
+BOOST_RULES = [
+    {"when": ("group_size", "Keluarga"), "any_tags": ["Keluarga", "Sharing"], "boost": 10.0},  # Logic Keluarga (High Priority)
+    {"when": ("weather", "Hujan"), "any_tags": ["Hangat"], "boost": 2.0},
+    {"when": ("weather", "Cerah"), "any_tags": ["Dingin"], "boost": 2.0},
+]
+
+# Filter guillotine: (konteks, nilai) -> tag yang dibuang dari kandidat
+GUILLOTINE_RULES = [
+    {"when": ("weather", "Hujan"), "drop_tag": "Dingin"},
+    {"when": ("group_size", "Sendiri"), "drop_tag": "Sharing"},
+]
+
+def make_context(weather, group_size, time_of_day=None):
+    return {"weather": weather, "group_size": group_size, "time_of_day": time_of_day}
+
+def _active_rules(context, rules):
+    return [r for r in rules if context.get(r["when"][0]) == r["when"][1]]
+
+def boost_for_tags(tags, context, rules=BOOST_RULES):
+    # Versi satu menu (list tag biasa)
+    return sum(r["boost"] for r in _active_rules(context, rules) if any(t in tags for t in r["any_tags"]))
+
+def guillotine_mask(tag_frame, context, rules=GUILLOTINE_RULES):
+    # True = menu boleh direkomendasikan di konteks ini
+    allowed = np.ones(len(tag_frame), dtype=bool)
+    for r in _active_rules(context, rules):
+        col = tag_col(r["drop_tag"])
+        if col in tag_frame: allowed &= ~tag_frame[col].to_numpy(dtype=bool)
+    return allowed
+
+def boost_vector(tag_frame, context, rules=BOOST_RULES):
+    # Versi vektor: tag_frame punya kolom tag_<Tag> (bool) dari menu_index.build_menu_index
+    boost = np.zeros(len(tag_frame))
+    for r in _active_rules(context, rules):
+        hit = np.zeros(len(tag_frame), dtype=bool)
+        for t in r["any_tags"]:
+            col = tag_col(t)
+            if col in tag_frame: hit |= tag_frame[col].to_numpy(dtype=bool)
+        boost += np.where(hit, r["boost"], 0.0)
+    return boost
+
+# ==========================================
+# 🏆 TOP-K TANPA SORT PENUH
+# ==========================================
+def top_k_indices(scores, k):
+    # partition O(n) untuk cari skor ke-k, lalu sort cuma k item. Seri skor -> urutan posisi asli, termasuk
+    # seri di batas ke-k (argpartition memilih seri di batas secara acak, jadi yang diambil skor di atas batas
+    # + seri dengan posisi terkecil). Hasil sama dengan np.argsort(-scores, kind="stable")[:k]
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    if n == 0 or k <= 0: return np.empty(0, dtype=np.int64)
+    cand = np.arange(n)
+    if k < n:
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        if not np.isnan(kth):   # NaN di urutan ke-k: jatuh ke sort penuh (NaN paling belakang)
+            above = np.flatnonzero(scores > kth)
+            cand = np.sort(np.concatenate([above, np.flatnonzero(scores == kth)[:k - len(above)]]))
+    return cand[np.argsort(-scores[cand], kind="stable")][:k]
+
+def top_k_by_mask(scores, mask, k):
+    # Top-k hanya di antara baris yang mask-nya True, hasil berupa posisi di array penuh
+    pos = np.flatnonzero(mask)
+    return pos[top_k_indices(np.asarray(scores)[pos], k)]
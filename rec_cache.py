@@ -0,0 +1,57 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ==========================================
+# 🗂️ CACHE SKOR REKOMENDASI (LRU)
+# ==========================================
+# Key: (user, cuaca, waktu, grup, versi_menu) -> hasil ranking final (top makanan & minuman)
+# Jadi rerun Streamlit untuk pelanggan yang sama cukup lookup dict, tanpa panggil TensorFlow.
+
+def get_menu_version(df_menu):
+    # Sidik jari isi tabel menu. Kalau menu berubah (harga/nama/item baru), versi ikut berubah
+    if df_menu is None or df_menu.empty: return "empty"
+    raw = pd.util.hash_pandas_object(df_menu, index=True).values.tobytes()
+    return hashlib.md5(raw).hexdigest()
+
+
+class RecScoreCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(user_key, weather, time_of_day, group_size, menu_version):
+        return (user_key, weather, time_of_day, group_size, menu_version)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "max": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,104 @@
+import numpy as np
+
+# ==========================================
+# ⚡ SCORING ENGINE (TANPA model.predict)
+# ==========================================
+# Model NCF kita cuma: 5 embedding -> concat -> Dense(relu) x N -> Dense(1).
+# model.predict() bikin pipeline data Keras lengkap tiap dipanggil, padahal matematikanya kecil.
+# Di sini bobot diambil SEKALI dari model, lalu skor dihitung pakai operasi matriks NumPy.
+#
+# Trik utama: Dense pertama dipecah per blok input, jadi
+#   relu(concat(e_u, e_m, e_w, e_t, e_g) @ W1 + b1) == relu(P_u[u] + P_m[m] + P_w[w] + P_t[t] + P_g[g] + b1)
+# dengan P_x = E_x @ W1_blok_x dihitung di awal. Skor banyak user x semua menu jadi satu broadcast.
+
+INPUT_ORDER = ["user", "menu", "weather", "time_of_day", "group_size"]
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+def extract_ncf_weights(model):
+    # Telusuri graph Keras: input -> Embedding -> Flatten -> Concatenate -> Dense...
+    layers_by_output = {id(l.output): l for l in model.layers}
+    inputs = list(model.inputs)
+
+    def input_index(tensor):
+        for k, t in enumerate(inputs):
+            if t is tensor: return k
+        raise ValueError("Embedding tidak terhubung langsung ke input model")
+
+    embeddings = [None] * len(inputs)
+    for l in model.layers:
+        if type(l).__name__ == "Embedding":
+            embeddings[input_index(l.input)] = np.asarray(l.get_weights()[0], dtype=np.float32)
+
+    concat = next(l for l in model.layers if type(l).__name__ == "Concatenate")
+    concat_order = []
+    for t in concat.input:
+        src = layers_by_output[id(t)]
+        if type(src).__name__ == "Flatten": src = layers_by_output[id(src.input)]
+        concat_order.append(input_index(src.input))
+
+    dense = []
+    for l in model.layers:
+        if type(l).__name__ == "Dense":
+            w, b = l.get_weights()
+            act = getattr(l.activation, "__name__", "linear")
+            if act not in ACTIVATIONS: raise ValueError(f"Aktivasi belum didukung: {act}")
+            dense.append((np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32), act))
+
+    return {"embeddings": embeddings, "concat_order": concat_order, "dense": dense}
+
+
+class NCFScorer:
+    def __init__(self, embeddings, concat_order, dense):
+        self.embeddings = embeddings
+        self.concat_order = list(concat_order)
+        self.dense = dense
+
+        # Proyeksi tiap tabel embedding ke Dense pertama (P_x = E_x @ W1_blok_x)
+        w1, b1, act1 = dense[0]
+        self.proj = [None] * len(embeddings)
+        start = 0
+        for inp_idx in self.concat_order:
+            width = embeddings[inp_idx].shape[1]
+            self.proj[inp_idx] = embeddings[inp_idx] @ w1[start:start + width]
+            start += width
+        self.b1 = b1
+        self.act1 = ACTIVATIONS[act1]
+        self.rest = [(w, b, ACTIVATIONS[a]) for w, b, a in dense[1:]]
+
+    @classmethod
+    def from_keras(cls, model):
+        return cls(**extract_ncf_weights(model))
+
+    @property
+    def vocab_sizes(self):
+        return dict(zip(INPUT_ORDER, [e.shape[0] for e in self.embeddings]))
+
+    def _head(self, h):
+        h = self.act1(h)
+        for w, b, act in self.rest:
+            h = act(h @ w + b)
+        return h[..., 0]
+
+    def score(self, user_idx, menu_idx, weather_idx, time_idx, group_idx):
+        # Pengganti model.predict([...]).flatten(): semua argumen boleh skalar/array (di-broadcast)
+        idx = [np.asarray(x, dtype=np.int64) for x in (user_idx, menu_idx, weather_idx, time_idx, group_idx)]
+        idx = np.broadcast_arrays(*idx)
+        h = self.b1
+        for p, ix in zip(self.proj, idx):
+            h = h + p[ix.reshape(-1)]
+        return self._head(h)
+
+    def score_matrix(self, user_idx, menu_idx, weather_idx, time_idx, group_idx):
+        # Banyak user x banyak menu dalam satu panggilan -> array (n_user, n_menu)
+        u = np.atleast_1d(np.asarray(user_idx, dtype=np.int64))
+        m = np.atleast_1d(np.asarray(menu_idx, dtype=np.int64))
+        ctx = self.b1 + self.proj[2][weather_idx] + self.proj[3][time_idx] + self.proj[4][group_idx]
+        h = self.proj[0][u][:, None, :] + (self.proj[1][m] + ctx)[None, :, :]
+        return self._head(h)
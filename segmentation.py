@@ -0,0 +1,191 @@
+import os
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from analytics import OrderCursor, order_statement
+
+# ==========================================
+# 💎 SEGMENTASI PELANGGAN (5 TIER + KMEANS)
+# ==========================================
+# Dulu tab segmentasi memanggil rfm.apply(get_5_tier_segment, axis=1): satu fungsi Python per pelanggan,
+# diulang di setiap rerun admin. Sekarang:
+#   - tier     : np.digitize total belanja terhadap ambang (bisa diatur lewat HOLYGRAIL_TIER_THRESHOLDS)
+#   - kmeans   : models/kmeans_model.pkl (scaler + KMeans 3 cluster), predict per batch
+# Fitur & hasil disimpan per pelanggan (user_id). Tiap refresh cuma menarik order baru (analytics.OrderCursor:
+# high-water-mark order_id + gap yang commit telat), dijumlah per pelanggan, dan segmen dihitung ulang hanya
+# untuk pelanggan yang punya order baru.
+
+# Urutan naik: indeks hasil np.digitize langsung jadi indeks label
+TIER_LABELS = ['5. 🥉 Bronze (Low)', '4. 🥈 Silver (Mid-Low)', '3. 🥇 Gold (Mid-High)', '2. 👑 Platinum (High)', '1. 💎 Diamond (VVIP)']
+TIER_ORDER = TIER_LABELS[::-1]
+TIER_COLORS = dict(zip(TIER_ORDER, ['#b9f2ff', '#e5e4e2', '#FFD700', '#C0C0C0', '#cd7f32']))
+DEFAULT_THRESHOLDS = "1000000,3000000,4500000,10000000"
+TIER_THRESHOLDS = [float(x) for x in os.environ.get('HOLYGRAIL_TIER_THRESHOLDS', DEFAULT_THRESHOLDS).split(',')]
+
+PREDICT_BATCH = 50_000
+SEGMENT_COLUMNS = ['Nama', 'Total_Belanja', 'Jumlah_Order', 'Rata_Rating', 'Segment']
+
+# Per order (bukan GROUP BY di SQL): OrderCursor butuh order_id yang benar-benar terbaca
+CUSTOMER_DELTA_QUERY = """
+SELECT o.order_id, o.user_id, u.name, m.price, o.rating
+FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+WHERE {where}
+"""
+
+NUM_COLUMNS = ['total_spend', 'frequency', 'rating_sum', 'rating_n']
+
+
+def assign_tiers(total_spend, thresholds=TIER_THRESHOLDS):
+    # Return kode tier (0 = Bronze .. 4 = Diamond). Batas bawah inklusif, sama dengan versi if/elif lama
+    if len(thresholds) != len(TIER_LABELS) - 1:
+        raise ValueError(f"Butuh {len(TIER_LABELS) - 1} ambang tier, dapat {len(thresholds)}")
+    return np.digitize(np.asarray(total_spend, dtype=float), np.sort(np.asarray(thresholds, dtype=float))).astype(np.int8)
+
+
+def tier_labels(codes):
+    return np.asarray(TIER_LABELS, dtype=object)[np.asarray(codes)]
+
+
+class KMeansSegmenter:
+    # Bungkus {'model': KMeans, 'scaler': StandardScaler}. Fitur mengikuti scaler.feature_names_in_
+    # (model bawaan: total_spend, frequency, avg_rating)
+    def __init__(self, model, scaler, batch_size=PREDICT_BATCH):
+        self.model = model
+        self.scaler = scaler
+        self.batch_size = batch_size
+        self.features = list(getattr(scaler, 'feature_names_in_', ['total_spend', 'frequency', 'avg_rating']))
+        self.labels = self._cluster_labels()
+
+    @classmethod
+    def load(cls, path=model_registry.KMEANS_PATH):
+        data = model_registry.get_kmeans(path)
+        if not data or 'model' not in data or 'scaler' not in data: return None
+        return cls(data['model'], data['scaler'])
+
+    def _cluster_labels(self):
+        # Nama cluster dari centroid (skala asli), diurutkan dari belanja terbesar
+        centers = pd.DataFrame(self.scaler.inverse_transform(self.model.cluster_centers_), columns=self.features)
+        spend = centers['total_spend'] if 'total_spend' in centers else centers.iloc[:, 0]
+        fmt = {'total_spend': "Rp {:,.0f}", 'frequency': "{:.0f}x order", 'avg_rating': "⭐{:.1f}"}
+        labels = [None] * len(centers)
+        for rank, c in enumerate(np.argsort(-spend.to_numpy(), kind='stable')):
+            desc = " · ".join(fmt.get(f, f + " {:,.1f}").format(centers.at[c, f]) for f in self.features)
+            labels[c] = f"K{rank + 1}. {desc}"
+        return labels
+
+    def predict(self, features):
+        # features: DataFrame berkolom self.features. Return kode cluster (int8), dihitung per batch
+        X = features[self.features]
+        out = np.empty(len(X), dtype=np.int8)
+        for start in range(0, len(X), self.batch_size):
+            part = X.iloc[start:start + self.batch_size]
+            out[start:start + len(part)] = self.model.predict(self.scaler.transform(part))
+        return out
+
+    @property
+    def order(self):
+        return sorted(self.labels)
+
+
+class CustomerSegments:
+    def __init__(self, engine, kmeans=None, thresholds=TIER_THRESHOLDS, ttl_seconds=30):
+        # kmeans: KMeansSegmenter atau None (mode KMeans tidak tersedia)
+        self.engine = engine
+        self.kmeans = kmeans
+        self.thresholds = list(thresholds)
+        self.ttl_seconds = ttl_seconds
+        self.customers = self._empty()
+        self.cursor = OrderCursor()
+        self.last_refresh = 0.0
+        self.last_changed = 0
+        self.recomputed = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty():
+        df = pd.DataFrame({c: pd.Series(dtype=float) for c in NUM_COLUMNS}, index=pd.Index([], name='user_id', dtype=np.int64))
+        df['name'] = pd.Series(dtype=object)
+        df['tier'] = pd.Series(dtype=np.int8)
+        df['cluster'] = pd.Series(dtype=np.int8)
+        return df
+
+    def _pull_delta(self):
+        # Agregat order baru per user_id (None kalau tidak ada), cursor ikut maju
+        where, params = self.cursor.where()
+        rows = pd.read_sql(order_statement(CUSTOMER_DELTA_QUERY.format(where=where), params), self.engine, params=params)
+        self.cursor.advance(rows['order_id'])
+        if rows.empty: return None
+        delta = rows.groupby('user_id').agg(name=('name', 'last'), total_spend=('price', 'sum'), frequency=('order_id', 'size'),
+                                             rating_sum=('rating', 'sum'), rating_n=('rating', 'count'))
+        return delta.astype({c: float for c in NUM_COLUMNS})
+
+    def _features(self, cust):
+        feats = pd.DataFrame({'total_spend': cust['total_spend'], 'frequency': cust['frequency']}, index=cust.index)
+        # Pelanggan tanpa rating diisi rata-rata data latih (netral setelah scaling)
+        fallback = self.kmeans.scaler.mean_[self.kmeans.features.index('avg_rating')] if self.kmeans and 'avg_rating' in self.kmeans.features else 0.0
+        feats['avg_rating'] = (cust['rating_sum'] / cust['rating_n'].replace(0, np.nan)).fillna(fallback)
+        return feats
+
+    def apply_delta(self, delta):
+        # delta: agregat order baru per user_id (kolom NUM_COLUMNS + name). Return jumlah pelanggan yang dihitung ulang
+        cur = self.customers
+        num = cur[NUM_COLUMNS].add(delta[NUM_COLUMNS], fill_value=0)
+        out = num.assign(name=delta['name'].combine_first(cur['name']).reindex(num.index))
+        out['tier'] = cur['tier'].reindex(num.index, fill_value=0).astype(np.int8)
+        out['cluster'] = cur['cluster'].reindex(num.index, fill_value=-1).astype(np.int8)
+
+        changed = out.loc[delta.index]
+        out.loc[delta.index, 'tier'] = assign_tiers(changed['total_spend'], self.thresholds)
+        if self.kmeans is not None:
+            out.loc[delta.index, 'cluster'] = self.kmeans.predict(self._features(changed))
+        self.customers = out
+        return len(delta)
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and time.monotonic() - self.last_refresh < self.ttl_seconds:
+                return self
+            delta = self._pull_delta()
+            self.last_changed = 0
+            if delta is not None:
+                self.last_changed = self.apply_delta(delta)
+                self.recomputed += self.last_changed
+            self.last_refresh = time.monotonic()
+            return self
+
+    def frame(self, mode='tier'):
+        # DataFrame untuk tab segmentasi admin (kolom SEGMENT_COLUMNS)
+        with self._lock:
+            cust = self.customers
+        if mode == 'kmeans' and self.kmeans is not None:
+            segment = np.asarray(self.kmeans.labels, dtype=object)[cust['cluster'].to_numpy()]
+        else:
+            segment = tier_labels(cust['tier'].to_numpy())
+        return pd.DataFrame({
+            'Nama': cust['name'].to_numpy(), 'Total_Belanja': cust['total_spend'].to_numpy(),
+            'Jumlah_Order': cust['frequency'].to_numpy().astype(np.int64),
+            'Rata_Rating': (cust['rating_sum'] / cust['rating_n'].replace(0, np.nan)).to_numpy(), 'Segment': segment,
+        }, columns=SEGMENT_COLUMNS)
+
+    def stats(self):
+        return {"customers": len(self.customers), "last_changed": self.last_changed, "recomputed": self.recomputed,
+                "kmeans": self.kmeans is not None, "last_order_id": self.cursor.last_id, "order_gaps": len(self.cursor.gaps)}
+
+    def reset(self):
+        with self._lock:
+            self.customers = self._empty()
+            self.cursor = OrderCursor()
+            self.last_refresh = 0.0
+
+
+def segment_rfm(rfm, thresholds=TIER_THRESHOLDS):
+    # Jalur tanpa database (stats dari df_trx): tier saja, tetap vektor
+    rfm = rfm.copy()
+    rfm['Segment'] = tier_labels(assign_tiers(rfm['Total_Belanja'], thresholds))
+    return rfm
@@ -0,0 +1,4 @@
+-- Index trigram untuk pencarian nama pelanggan di kasir (name ILIKE '%...%')
+-- Tanpa index ini ILIKE dengan wildcard di depan selalu sequential scan tabel users.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops);
@@ -0,0 +1,15 @@
+-- Penanda perubahan katalog menu untuk menu_catalog.MenuCatalog (cek versi murah, bukan SELECT * tiap rerun).
+-- updated_at otomatis di-bump trigger setiap UPDATE; INSERT/DELETE terdeteksi dari COUNT(*) + MAX(menu_id).
+ALTER TABLE menu ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS ix_menu_updated_at ON menu (updated_at);
+
+CREATE OR REPLACE FUNCTION menu_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_menu_touch_updated_at ON menu;
+CREATE TRIGGER trg_menu_touch_updated_at BEFORE UPDATE ON menu
+    FOR EACH ROW EXECUTE FUNCTION menu_touch_updated_at();
@@ -0,0 +1,3 @@
+-- Index untuk browser transaksi admin (trx_browser.py): ORDER BY timestamp DESC, order_id DESC LIMIT n
+-- plus kursor keyset (timestamp, order_id), jadi tiap halaman cukup index scan pendek tanpa sort.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_timestamp_order_id ON orders (timestamp DESC, order_id DESC);
@@ -0,0 +1,8 @@
+-- Kunci idempotensi checkout (checkout_journal.py): entri journal yang di-replay setelah crash/retry
+-- tidak menulis order dobel. Kunci diklaim di transaksi yang sama dengan INSERT orders.
+CREATE TABLE IF NOT EXISTS checkout_idempotency (
+    idem_key VARCHAR(64) PRIMARY KEY,
+    user_id INTEGER,
+    n_rows INTEGER,
+    applied_at TIMESTAMP
+);
@@ -0,0 +1,34 @@
+-- ==========================================
+-- 📦 ROLLUP ANALYTICS ADMIN (MATERIALIZED VIEW)
+-- ==========================================
+-- Dipakai analytics_sql.SqlAnalytics(use_rollups=True).
+-- Buat sekali:   python analytics_sql.py create   (definisi berubah: create --recreate)
+-- Refresh rutin: python analytics_sql.py refresh   (misal tiap 5 menit via cron)
+
+-- Penjualan per hari x jam x menu (join users sama seperti query live, order tanpa user valid tidak dihitung)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_sales_daily_hour_menu AS
+SELECT date_trunc('day', o.timestamp)::date AS day,
+       EXTRACT(HOUR FROM o.timestamp)::int AS hour,
+       o.menu_id,
+       COUNT(*) AS n_orders,
+       SUM(m.price) AS revenue
+FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_sales_daily_hour_menu ON mv_sales_daily_hour_menu (day, hour, menu_id);
+
+-- Total belanja seumur hidup per pelanggan
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_customer_lifetime AS
+SELECT u.user_id,
+       u.name,
+       COUNT(*) AS n_orders,
+       SUM(m.price) AS total_spend,
+       MAX(o.timestamp) AS last_order
+FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+GROUP BY u.user_id, u.name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_customer_lifetime ON mv_customer_lifetime (user_id);
@@ -0,0 +1,121 @@
+import time
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from analytics import TRX_COLUMNS
+from trx_export import filter_clauses
+
+# ==========================================
+# 📝 BROWSER TRANSAKSI (PAGINASI KEYSET DI DATABASE)
+# ==========================================
+# Dulu tab Data Transaksi mengurutkan seluruh df_trx di memori lalu mengirim semuanya ke st.dataframe.
+# Sekarang satu halaman = satu query: filter tanggal & kategori di WHERE, ORDER BY timestamp DESC, order_id DESC
+# dan LIMIT. Halaman berikutnya pakai kursor (timestamp, order_id) baris terakhir (keyset), bukan OFFSET,
+# jadi biaya halaman ke-1000 sama dengan halaman pertama. Total baris (COUNT) di-cache per filter dengan TTL.
+# Index pendukung: sql/migrations/003_orders_timestamp_order_id.sql
+
+PAGE_SIZE = 50
+
+BROWSE_QUERY = """
+SELECT o.order_id, o.timestamp as order_datetime, m.menu_name, m.price as total_price,
+       m.category, u.name as customer_name
+FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+{where}
+ORDER BY o.timestamp DESC, o.order_id DESC
+LIMIT :lim
+"""
+
+COUNT_QUERY = """
+SELECT COUNT(*)
+FROM orders o
+JOIN menu m ON o.menu_id = m.menu_id
+JOIN users u ON o.user_id = u.user_id
+{where}
+"""
+
+
+def _statement(template, where, categories):
+    stmt = text(template.format(where=("WHERE " + " AND ".join(where)) if where else ""))
+    if categories: stmt = stmt.bindparams(bindparam("cats", expanding=True))
+    return stmt
+
+
+class TransactionPage:
+    def __init__(self, frame, next_cursor):
+        self.frame = frame              # kolom TRX_COLUMNS, urut terbaru dulu
+        self.next_cursor = next_cursor  # None kalau ini halaman terakhir
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def fetch_page(engine, start=None, end=None, categories=None, cursor=None, page_size=PAGE_SIZE):
+    # cursor: (timestamp, order_id) baris terakhir halaman sebelumnya, None = halaman pertama
+    where, params = filter_clauses(start, end, categories)
+    if cursor is not None:
+        where.append("(o.timestamp < :c_ts OR (o.timestamp = :c_ts AND o.order_id < :c_id))")
+        params["c_ts"], params["c_id"] = cursor
+    params["lim"] = page_size + 1  # satu baris ekstra = penanda masih ada halaman berikutnya
+    with engine.connect() as conn:
+        rows = conn.execute(_statement(BROWSE_QUERY, where, categories), params).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        # Nilai mentah dari driver (string di SQLite, datetime di Postgres) supaya pembandingnya sama persis
+        next_cursor = (rows[-1][1], int(rows[-1][0]))
+    frame = pd.DataFrame([r[1:] for r in rows], columns=TRX_COLUMNS)
+    if not frame.empty: frame['order_datetime'] = pd.to_datetime(frame['order_datetime'], format='ISO8601')
+    return TransactionPage(frame, next_cursor)
+
+
+def count_transactions(engine, start=None, end=None, categories=None):
+    where, params = filter_clauses(start, end, categories)
+    with engine.connect() as conn:
+        return int(conn.execute(_statement(COUNT_QUERY, where, categories), params).scalar())
+
+
+class CountCache:
+    # COUNT(*) per kombinasi filter, berlaku ttl_seconds (angka total boleh telat sedikit)
+    def __init__(self, ttl_seconds=30, max_entries=64):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(start, end, categories):
+        return (start, end, tuple(sorted(categories or ())))
+
+    def count(self, engine, start=None, end=None, categories=None):
+        key = self.key(start, end, categories)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        n = count_transactions(engine, start, end, categories)
+        with self._lock:
+            self._data[key] = (time.monotonic(), n)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return n
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}